@@ -0,0 +1,39 @@
+from fcmlib import FCM
+import numpy as np
+import random
+
+#tolerance of float32 simulation against float64 simulation
+#(float32 has ~7 significant digits and sigmoid squashes rounding errors, so results agree to ~1e-5)
+TOLERANCE = 1e-5
+
+def build(precision, concepts=200, connections=5, seed=1):
+    """Return random map of RSimpleSigmoid relations compiled with given precision."""
+    random.seed(seed)
+    map = FCM()
+    map.config.precision = precision
+    for i in range(concepts):
+        map.add("C%d" % i, random.random())
+    for i in range(concepts):
+        for j in random.sample(range(concepts), connections):
+            map.connect("C%d" % j, "C%d" % i)
+            map["C%d" % i].relation.set("C%d" % j, random.uniform(-1, 1))
+    map.compile()
+    return map
+
+print("simulate the same map with float64 and float32 precision")
+single = build("float32")
+double = build("float64")
+print("state memory:", double.engine.state.nbytes, "bytes (float64),", single.engine.state.nbytes, "bytes (float32)")
+
+print("trajectory of 100 steps")
+error = np.max(np.abs(single.run(100) - double.run(100)))
+print("maximal difference:", error)
+assert error <= TOLERANCE
+
+print("batch of 1000 scenarios")
+states = np.random.random((1000, len(double)))
+error = np.max(np.abs(single.simulate_batch(states, 20) - double.simulate_batch(states, 20)))
+print("maximal difference:", error)
+assert error <= TOLERANCE
+
+print("float32 results agree with float64 within tolerance", TOLERANCE)
@@ -1,5 +1,6 @@
 from .fcm import Concept, FCM
 from .config import Config
-from . import functions, relations
+from .trajectory import Trajectory
+from . import functions, relations, kernels, learning
 
-del fcm, config
\ No newline at end of file
+del fcm, config, engine, trajectory
\ No newline at end of file
@@ -4,6 +4,9 @@ from fcmlib import functions as flib
 _defaultRelation = rlib.RSimpleSigmoid
 _defaultInputMF = flib.PiecewiseLinear
 _defaultOutputMF = flib.PiecewiseLinear
+_defaultBackend = "auto"
+_sparseDensity = 0.1
+_precision = "float64"
 
 class Config:
     """Configuration for FCM functions & relations
@@ -12,6 +15,9 @@ class Config:
     - defaultRelation - default FCM relation
     - defaultInputMF  - default fuzzification function
     - defaultOutputMF - default defuzzification function
+    - defaultBackend  - default backend of compiled engine ("auto", "dense" or "sparse")
+    - sparseDensity   - connection density below which "auto" backend uses sparse weight matrices
+    - precision       - floating point precision of compiled engines, batched simulations & learning ("float64" or "float32")
     
     - functions - library of available functions
     - relations - library of available relations
@@ -20,6 +26,9 @@ class Config:
     defaultRelation = _defaultRelation
     defaultInputMF = _defaultInputMF
     defaultOutputMF = _defaultOutputMF
+    defaultBackend = _defaultBackend
+    sparseDensity = _sparseDensity
+    precision = _precision
     
     relations = rlib
     functions = flib
@@ -30,6 +39,9 @@ class Config:
         self.defaultRelation = _defaultRelation
         self.defaultInputMF = _defaultInputMF
         self.defaultOutputMF = _defaultOutputMF
+        self.defaultBackend = _defaultBackend
+        self.sparseDensity = _sparseDensity
+        self.precision = _precision
     
         self.relations = rlib
         self.functions = flib
@@ -0,0 +1,314 @@
+from fcmlib import relations as rlib
+from fcmlib import kernels as klib
+from itertools import repeat
+import numpy as np
+
+class Engine:
+    """Compiled (vectorized) form of FCM used for fast simulation.
+       Activation values of all concepts are held in single state vector and new values are calculated by compiled kernels.
+
+    Attributes:
+    - names   - list of concept names ordered by state vector indices
+    - index   - dictionary mapping concept names to state vector indices
+    - state   - numpy array containing current activation values of all concepts
+    - kernels - list of compiled kernels (class IKernel) calculating new values of following concepts
+    - backend - storage of weights requested during compilation
+    - dtype   - numpy data type of state & weights (given by precision of map configuration)
+    """
+
+    names = None
+    index = None
+    state = None
+    kernels = None
+    backend = None
+    dtype = None
+
+    def __init__(self, fcm, backend=None):
+        """Engine instantiation operation (constructor).
+
+        Arguments:
+        - fcm     - FCM object to be compiled
+        - backend - "dense", "sparse" or "auto" (selected by connection density) storage of weights (optional)
+        Returns:
+        - new Engine object or raises Error Exception.
+        """
+
+        if fcm.config.precision not in ("float32", "float64"):
+            raise Exception("Error - unsupported precision " + str(fcm.config.precision))
+        self.dtype = np.dtype(fcm.config.precision)
+        self.names = list(fcm.keys())
+        self.index = dict([(name, i) for i, name in enumerate(self.names)])
+        self.state = np.zeros(len(self.names), dtype=self.dtype)
+        self.pull(fcm)
+        #group following concepts by type of their relation
+        groups = {}
+        for name in self.names:
+            relation = fcm[name].relation
+            if len(relation.previous) > 0:
+                groups.setdefault(type(relation), []).append(name)
+        #compile each group into single kernel
+        if backend is None:
+            backend = fcm.config.defaultBackend
+        if backend not in ("auto", "dense", "sparse"):
+            raise Exception("Error - unknown backend " + str(backend))
+        self.backend = backend
+        self.kernels = []
+        for relationType, names in groups.items():
+            if relationType is rlib.RSimpleSigmoid:
+                if backend == "auto":
+                    connections = sum([len(fcm[name].relation.previous) for name in names])
+                    density = connections / (len(names) * len(self.names))
+                    kernelType = klib.KSparse if density < fcm.config.sparseDensity else klib.KDense
+                else:
+                    kernelType = klib.KSparse if backend == "sparse" else klib.KDense
+                self.kernels.append(kernelType(fcm, names, self.index))
+            elif relationType is rlib.RNeural:
+                #networks with identical layer shapes are stacked into single kernel
+                shapes = {}
+                for name in names:
+                    shapes.setdefault(tuple([w.shape for w in fcm[name].relation.weights]), []).append(name)
+                for shapeNames in shapes.values():
+                    self.kernels.append(klib.KNeural(fcm, shapeNames, self.index))
+            elif relationType is rlib.R3Term:
+                self.kernels.append(klib.K3Term(fcm, names, self.index))
+            else:
+                raise Exception("Error - relation " + relationType.__name__ + " is not supported by compiled engine")
+
+    def __repr__(self):
+        """Return repr(self)."""
+
+        return '%s(%s)' % (type(self).__name__, str(self.kernels))
+
+    def propagate(self, state, out=None):
+        """Calculate new activation values of all concepts from provided state.
+
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        - out   - preallocated numpy array (other than state) used to store the result (optional)
+        Returns:
+        - numpy array containing new activation values of all concepts
+        """
+
+        if out is None:
+            out = state.copy()
+        else:
+            out[...] = state
+        for kernel in self.kernels:
+            out[..., kernel.targets] = kernel.propagate(state)
+        return out
+
+    def close(self):
+        """Release resources held by the engine."""
+
+        pass
+
+    def step(self):
+        """Update current state of the engine by single simulation step.
+
+        Returns:
+        - numpy array containing new activation values of all concepts
+        """
+
+        self.state = self.propagate(self.state)
+        return self.state
+
+    def run(self, steps, every=1):
+        """Update current state of the engine by multiple simulation steps and record its trajectory.
+
+        Arguments:
+        - steps - number of simulation steps
+        - every - record state after each "every" steps, 0 disables recording (optional)
+        Returns:
+        - numpy array of recorded states (records x concepts) or None
+        """
+
+        result = np.empty((steps // every, len(self.names)), dtype=self.dtype) if every > 0 else None
+        buffer = np.empty_like(self.state)
+        for step in range(1, steps + 1):
+            self.state, buffer = self.propagate(self.state, buffer), self.state
+            if every > 0 and step % every == 0:
+                result[step // every - 1] = self.state
+        return result
+
+    def converge(self, tol=1e-6, steps=1000, history=100):
+        """Update current state of the engine until it reaches fixed point or limit cycle.
+
+        Arguments:
+        - tol     - maximal absolute difference of activation values considered equal (optional)
+        - steps   - maximal number of simulation steps (optional)
+        - history - number of recent states searched for repetition (maximal detected period) (optional)
+        Returns:
+        - Attractor object describing reached behaviour or raises Error exception
+        """
+
+        if tol <= 0:
+            raise Exception("Error - tol must be positive")
+        if steps < 1:
+            raise Exception("Error - steps must be positive integer")
+        if history < 1:
+            raise Exception("Error - history must be positive integer")
+        buffer = np.empty_like(self.state)
+        recent = np.empty((history, len(self.names)), dtype=self.dtype)
+        keys = [None] * history
+        seen = {}
+        for step in range(1, steps + 1):
+            self.state, buffer = self.propagate(self.state, buffer), self.state
+            #fixed point - state did not change
+            if np.max(np.abs(self.state - buffer), initial=0) <= tol:
+                return Attractor(Attractor.FIXED_POINT, step, 1)
+            #limit cycle - state repeats one of recent (hashed) states
+            key = hash(np.floor(self.state / tol).tobytes())
+            if key in seen and np.max(np.abs(self.state - recent[seen[key] % history]), initial=0) <= tol:
+                return Attractor(Attractor.LIMIT_CYCLE, step, step - seen[key])
+            slot = step % history
+            if keys[slot] is not None and seen.get(keys[slot]) == step - history:
+                del seen[keys[slot]]
+            keys[slot] = key
+            seen[key] = step
+            recent[slot] = self.state
+        return Attractor(Attractor.CHAOTIC, steps, None)
+
+    def simulate(self, states, steps, trajectory=False, clamp=None):
+        """Simulate multiple scenarios (initial states) at once without changing current state of the engine.
+
+        Arguments:
+        - states     - array of initial states (scenarios x concepts), columns ordered as engine names
+        - steps      - number of simulation steps
+        - trajectory - return states after each step instead of final states only (optional)
+        - clamp      - state vector indices of concepts held fixed at their initial values (optional)
+        Returns:
+        - numpy array of final states (scenarios x concepts) or trajectory tensor (steps x scenarios x concepts)
+        """
+
+        states = self.__scenarios(states)
+        if trajectory:
+            result = np.empty((steps,) + states.shape, dtype=self.dtype)
+        if clamp is not None:
+            clamp = np.asarray(clamp, dtype=np.intp)
+            fixed = states[..., clamp]
+        #stateful kernels start with fresh history for simulated states
+        history = [kernel.history for kernel in self.kernels]
+        for kernel in self.kernels:
+            kernel.reset(states)
+        try:
+            for step in range(steps):
+                states = self.propagate(states)
+                if clamp is not None:
+                    states[..., clamp] = fixed
+                if trajectory:
+                    result[step] = states
+        finally:
+            for kernel, kernelHistory in zip(self.kernels, history):
+                kernel.history = kernelHistory
+        return result if trajectory else states
+
+    def settle(self, states, tol=1e-6, steps=1000, clamp=None):
+        """Simulate multiple scenarios at once until all of them reach fixed point, without changing current state of the engine.
+
+        Arguments:
+        - states - array of initial states (scenarios x concepts), columns ordered as engine names
+        - tol    - maximal absolute difference of activation values considered equal (optional)
+        - steps  - maximal number of simulation steps (optional)
+        - clamp  - state vector indices of concepts held fixed at their initial values (optional)
+        Returns:
+        - tuple (numpy array of final states (scenarios x concepts),
+                 numpy array of numbers of steps needed to reach fixed point, -1 if not reached (scenarios))
+        """
+
+        states = self.__scenarios(states)
+        reached = np.full(states.shape[:-1], -1)
+        if clamp is not None:
+            clamp = np.asarray(clamp, dtype=np.intp)
+            fixed = states[..., clamp]
+        buffer = np.empty_like(states)
+        history = [kernel.history for kernel in self.kernels]
+        for kernel in self.kernels:
+            kernel.reset(states)
+        try:
+            for step in range(1, steps + 1):
+                states, buffer = self.propagate(states, buffer), states
+                if clamp is not None:
+                    states[..., clamp] = fixed
+                #all scenarios are simulated until the last one is stable (keeps history of stateful kernels aligned)
+                stable = np.max(np.abs(states - buffer), axis=-1, initial=0) <= tol
+                reached[stable & (reached < 0)] = step
+                if np.all(reached >= 0):
+                    break
+        finally:
+            for kernel, kernelHistory in zip(self.kernels, history):
+                kernel.history = kernelHistory
+        return states, reached
+
+    def __scenarios(self, states):
+        """Return copy of scenarios as float array or raise Error exception."""
+
+        states = np.array(states, dtype=self.dtype)
+        if states.shape[-1] != len(self.names):
+            raise Exception("Error - states must have " + str(len(self.names)) + " columns")
+        return states
+
+    def pull(self, fcm):
+        """Read current activation values of concepts into engine state.
+
+        Arguments:
+        - fcm - compiled FCM object
+        """
+
+        self.state[:] = [concept.value for concept in self.__concepts(fcm)]
+
+    def push(self, fcm, history=True):
+        """Write current engine state back to activation values of concepts.
+
+        Arguments:
+        - fcm     - compiled FCM object
+        - history - write history of stateful kernels back to relations as well (optional)
+        """
+
+        for concept, value in zip(self.__concepts(fcm), self.state.tolist()):
+            concept.value = value
+            concept.newValue = value
+        if history:
+            for kernel in self.kernels:
+                kernel.push(fcm)
+
+    def __concepts(self, fcm):
+        """Return list of concepts of the map ordered by state vector indices."""
+
+        return list(map(dict.__getitem__, repeat(fcm), self.names))
+
+class Attractor:
+    """Describes behaviour reached by FCM simulation.
+
+    Attributes:
+    - kind   - FIXED_POINT, LIMIT_CYCLE or CHAOTIC (no repetition found within maximal number of steps)
+    - steps  - number of simulation steps performed
+    - period - period of limit cycle (1 for fixed point, None for chaotic behaviour)
+    """
+
+    FIXED_POINT = "fixed point"
+    LIMIT_CYCLE = "limit cycle"
+    CHAOTIC = "chaotic"
+
+    kind = None
+    steps = None
+    period = None
+
+    def __init__(self, kind, steps, period):
+        """Attractor instantiation operation (constructor).
+
+        Arguments:
+        - kind   - kind of reached behaviour
+        - steps  - number of performed simulation steps
+        - period - period of limit cycle
+        Returns:
+        - new Attractor object.
+        """
+
+        self.kind = kind
+        self.steps = steps
+        self.period = period
+
+    def __repr__(self):
+        """Return repr(self)."""
+
+        return '%s(%s)' % (type(self).__name__, str(dict(kind=self.kind, steps=self.steps, period=self.period)))
@@ -1,5 +1,11 @@
 from fcmlib.config import Config
+from fcmlib.engine import Engine
+from fcmlib.trajectory import Trajectory
+from fcmlib.learning import GradientDescent, DifferentialEvolution, HebbianLearning
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
 import json, jsonpickle
+import numpy as np
 
 import jsonpickle.ext.numpy as jsonpickle_numpy
 jsonpickle_numpy.register_handlers() #numpy support for object serialization
@@ -7,6 +13,9 @@ jsonpickle_numpy.register_handlers() #numpy support for object serialization
 class Concept:
     """Represents single FCM concept.
     
+    Activation values & errors are kept in slots of the concept (compiled engine gathers them into arrays).
+    Membership functions are created on first access.
+    
     Attributes:
     - name      - The unique name of the concept.
     - value     - The activation value of the concept in time "t".
@@ -16,16 +25,10 @@ class Concept:
     - relation  - The relation (class IRelation) with previous concepts.
     - inputMF   - The function (class IFunction) used for fuzzification
     - outputMF  - The function (class IFunction) used for defuzzification.
+    - config    - The configuration used to create default functions.
     """
     
-    name = None
-    value = None
-    newValue = None
-    error = None
-    newError = None
-    relation = None
-    inputMF = None
-    outputMF = None
+    __slots__ = ("name", "value", "newValue", "error", "newError", "relation", "config", "_inputMF", "_outputMF")
     
     def __init__(self, name, value=0, conf=Config):
         """Concept instantiation operation (constructor).
@@ -44,24 +47,84 @@ class Concept:
         self.error = 0
         self.newError = 0
         self.relation = conf.defaultRelation()
-        self.inputMF = conf.defaultInputMF()
-        self.outputMF = conf.defaultOutputMF()
+        self.config = conf
+        self._inputMF = None
+        self._outputMF = None
     
     def __repr__(self):
         """Return repr(self)."""        
         return str(self.value)
+    
+    def __getstate__(self):
+        """Return state of the concept used for serialization."""
+        
+        return {"name": self.name, "value": self.value, "newValue": self.newValue, "error": self.error, "newError": self.newError,
+                "relation": self.relation, "inputMF": self._inputMF, "outputMF": self._outputMF}
+    
+    def __setstate__(self, state):
+        """Restore state of the concept used for deserialization."""
+        
+        self.config = Config
+        #values missing in older files default to zero
+        self.value = self.newValue = self.error = self.newError = 0
+        self.relation = self._inputMF = self._outputMF = None
+        for key, value in state.items():
+            setattr(self, key, value)
+    
+    @property
+    def inputMF(self):
+        if getattr(self, "_inputMF", None) is None:
+            self._inputMF = getattr(self, "config", Config).defaultInputMF()
+        return self._inputMF
+    
+    @inputMF.setter
+    def inputMF(self, function):
+        self._inputMF = function
+    
+    @property
+    def outputMF(self):
+        if getattr(self, "_outputMF", None) is None:
+            self._outputMF = getattr(self, "config", Config).defaultOutputMF()
+        return self._outputMF
+    
+    @outputMF.setter
+    def outputMF(self, function):
+        self._outputMF = function
         
 
+class ConceptHandler(jsonpickle.handlers.BaseHandler):
+    """Serialization handler keeping JSON representation of concepts flat (slots are not pickled by default)."""
+    
+    def flatten(self, obj, data):
+        for key, value in obj.__getstate__().items():
+            data[key] = self.context.flatten(value, reset=False)
+        return data
+    
+    def restore(self, data):
+        concept = Concept.__new__(Concept)
+        concept.__setstate__(dict([(key, self.context.restore(value, reset=False)) for key, value in data.items() if not key.startswith("py/")]))
+        return concept
+
+ConceptHandler.handles(Concept)
+
 class FCM(dict):
     """Represents fuzzy cognitive map. Provides methods to add, connect and configure map concepts and to calculate map updates.
     
     Attributes:
     - config    - current FCM configuration
     - name      - FCM identification name
+    - engine    - compiled simulation engine (class Engine) or None
+    - dirty     - set of names of concepts changed since last incremental update (None if not tracked)
+    - following - dictionary mapping concept names to sets of names of their following concepts (concepts without followers are omitted)
+    - stateful  - list of names of concepts with stateful relations used by incremental update
     """
     
     config = None
     name = None
+    engine = None
+    dirty = None
+    following = None
+    stateful = None
     
     #TODO - add name initialization
     def __init__(self, *args, **kwargs):
@@ -69,6 +132,8 @@ class FCM(dict):
         
         # default config
         self.config = Config()
+        # index of following concepts
+        self.following = {}
         # load from JSON string
         if len(args)==1 and isinstance(args[0],str) and args[0][0]=="{":
             self.deserialize(args[0])
@@ -91,17 +156,64 @@ class FCM(dict):
         """Set self[key] to value."""
 
         if isinstance(val,Concept):
+            self.decompile()
+            if key in self:
+                self.__unlink(key)
             dict.__setitem__(self, key, val)
+            self.__link(key)
         elif key in self:
             self[key].value=float(val)
             self[key].newValue=float(val)
+            if self.engine is not None:
+                self.engine.state[self.engine.index[key]]=float(val)
+            if self.dirty is not None:
+                self.dirty.add(key)
         elif isinstance(val,int):
+            self.decompile()
             dict.__setitem__(self, key, Concept(key,float(val),self.config))
+            self.__link(key)
         elif isinstance(val,float):
+            self.decompile()
             dict.__setitem__(self, key, Concept(key,val,self.config))
+            self.__link(key)
         else:
             raise Exception("Error - unsupported value type of",type(val))
 
+    def __delitem__(self, key):
+        """Delete self[key]."""
+        
+        self.decompile()
+        if key in self:
+            self.__unlink(key)
+            if self.following is not None:
+                self.following.pop(key, None)
+        dict.__delitem__(self, key)
+
+    def __link(self, name):
+        """Add concept and its connections to the index of following concepts."""
+        
+        if self.following is None:
+            return
+        for prev in self[name].relation.previous:
+            self.following.setdefault(prev.name, set()).add(name)
+
+    def __unlink(self, name):
+        """Remove connections of concept from the index of following concepts."""
+        
+        if self.following is None:
+            return
+        for prev in self[name].relation.previous:
+            self.__unfollow(prev.name, name)
+
+    def __unfollow(self, preceding, following):
+        """Remove single connection from the index of following concepts (empty sets are not kept)."""
+        
+        followers = self.following.get(preceding)
+        if followers is not None:
+            followers.discard(following)
+            if not followers:
+                del self.following[preceding]
+
     def __repr__(self):
         """Return repr(self)."""
         
@@ -121,7 +233,9 @@ class FCM(dict):
         elif name in self:
             raise Exception("Error - name is already used for another concept")
         else:
+            self.decompile()
             dict.__setitem__(self, name, Concept(name,value,self.config))
+            self.__link(name)
             
     def remove(self, name):
         """Remove concept from the FCM.
@@ -136,8 +250,9 @@ class FCM(dict):
         elif not name in self:
             raise Exception("Error - there is no concept with name to be removed")
         else:
-            for concept in self:
-                if name in [x.name for x in self[concept].relation.previous]:
+            self.decompile()
+            for concept in self.following.get(name, ()):
+                if concept != name:
                     self[concept].relation.detach(self[name])
             del self[name]
             
@@ -159,7 +274,19 @@ class FCM(dict):
         elif newname in self:
             raise Exception("Error - concept with newname already exists")
         else:
-            self[newname]=self.pop(currentname)
+            self.decompile()
+            concept = dict.pop(self, currentname)
+            for prev in concept.relation.previous:
+                self.following[prev.name].discard(currentname)
+                self.following[prev.name].add(newname)
+            followers = self.following.pop(currentname, None)
+            if followers:
+                self.following[newname] = followers
+            for follower in self.following.get(newname, ()):
+                relation = concept.relation if follower == newname else self[follower].relation
+                relation.rename(currentname, newname)
+            concept.name = newname
+            dict.__setitem__(self, newname, concept)
 
     def connect(self, preceding, following):
         """Connects two concepts within the FCM.
@@ -179,7 +306,9 @@ class FCM(dict):
                 self[preceding]=0
             if not following in self:
                 self[following]=0
+            self.decompile()
             self[following].relation.attach(self[preceding])
+            self.following.setdefault(preceding, set()).add(following)
         
     def disconnect(self, preceding, following):
         """Disconnects two concepts within the FCM.
@@ -199,7 +328,9 @@ class FCM(dict):
         elif not following in self:
             raise Exception("Error - there is no following concept with name " + following)
         else:
+            self.decompile()
             self[following].relation.detach(self[preceding])
+            self.__unfollow(preceding, following)
 
     def get(self, name):
         """Get concept reference by name
@@ -230,26 +361,507 @@ class FCM(dict):
         elif not isinstance(value, (int,float,Concept)):
             raise Exception("Error - value is neither numeric type nor Concept instance")
         elif isinstance(value, Concept):
-            if name in self:
-                del self[name]
             self[name]=value
         elif isinstance(value, (int,float)):
             self[name]=float(value)
         else:
             raise Exception("Error - cannot set value")
     
-    def update(self):
+    def compile(self, backend=None, workers=None):
+        """Compile the map into vectorized simulation engine used by subsequent updates
+        
+        Structural changes made via FCM methods discard the engine automatically.
+        Call compile() again after relation weights are changed directly via relation objects.
+        While compiled, activation values must be set via the map (map[name]=value), values written
+        directly to concept objects (concept.value=x) are not seen by the engine and are overwritten by
+        the next update(), call compile() again after such writes.
+        
+        Arguments:
+        - backend - "dense", "sparse" or "auto" storage of weights (optional, default taken from config)
+        - workers - number of worker processes used to evaluate the map in parallel (optional)
+        Returns:
+        - None or raises Error Exception.
+        """
+        self.decompile()
+        if workers is not None and workers > 1:
+            #imported on demand (shared memory requires Python 3.8+)
+            from fcmlib.parallel import ParallelEngine
+            self.engine = ParallelEngine(self, backend, workers)
+        else:
+            self.engine = Engine(self, backend)
+    
+    def decompile(self):
+        """Write state of compiled engine back to concepts and discard the engine (and incremental update state)
+        
+        Returns:
+        - None or raises Error Exception.
+        """
+        if self.engine is not None:
+            self.engine.push(self)
+            self.engine.close()
+            self.engine = None
+        self.dirty = None
+    
+    def sync(self):
+        """Write state of compiled engine back to activation values of concepts and history of stateful relations (R3Term)
+        
+        Returns:
+        - None or raises Error Exception.
+        """
+        if self.engine is not None:
+            self.engine.push(self)
+    
+    def update(self, sync=True, incremental=False):
         """Update activation values of all concept within the map
         
+        In incremental mode, only concepts following the concepts changed since last incremental update
+        (set via FCM methods or changed by previous update) are recalculated. Concepts with stateful
+        relations (R3Term) are always recalculated. Values written directly to concept objects
+        (concept.value=x) are not tracked, so their followers are not recalculated; set values via the map
+        (map[name]=value) or call update() without incremental mode after such writes.
+        
+        If map is compiled, values must be set via the map as well (see compile()). Compiled update writes
+        only activation values back to concepts, history of stateful relations (R3Term) is written back to
+        relation objects by sync() or decompile().
+        
+        Arguments:
+        - sync - if map is compiled, write new values back to concepts (optional)
+        - incremental - if map is not compiled, recalculate only concepts affected by changes (optional)
         Returns:
         - None or raises Error Exception.
         """
-        for name, concept in self.items():
-            if len(concept.relation.previous)>0:
-                concept.newValue = concept.relation.propagate()
-        for name, concept in self.items():
+        if self.engine is not None:
+            self.engine.step()
+            if sync:
+                self.engine.push(self, False)
+            return
+        if not incremental:
+            self.dirty = None
+            for name, concept in self.items():
+                if len(concept.relation.previous)>0:
+                    concept.newValue = concept.relation.propagate()
+            for name, concept in self.items():
+                concept.value = concept.newValue
+            return
+        #first incremental update recalculates all concepts
+        if self.dirty is None:
+            self.stateful = [name for name, concept in self.items() if isinstance(concept.relation, self.config.relations.R3Term)]
+            affected = set(self.keys())
+        #other updates recalculate followers of changed concepts (and changed concepts themselves)
+        else:
+            affected = set(self.stateful)
+            for name in self.dirty:
+                affected.add(name)
+                affected.update(self.following.get(name, ()))
+        affected = [self[name] for name in affected if len(self[name].relation.previous)>0]
+        for concept in affected:
+            concept.newValue = concept.relation.propagate()
+        self.dirty = set()
+        for concept in affected:
+            if concept.newValue != concept.value:
+                self.dirty.add(concept.name)
             concept.value = concept.newValue
     
+    def run(self, steps, record=True, store=None):
+        """Update activation values of all concepts by multiple simulation steps and record the trajectory
+        
+        Arguments:
+        - steps - number of simulation steps
+        - record - True (record each step), False or 0 (no recording) or integer k (record each k-th step) (optional)
+        - store - Trajectory object or path of new trajectory file, records are written into it by blocks instead of being returned (optional)
+        Returns:
+        - numpy array of recorded states (records x concepts) with columns given by columns(), Trajectory object or None
+        """
+        if not isinstance(steps, (int, np.integer)) or isinstance(steps, bool) or steps < 0:
+            raise Exception("Error - steps must be non-negative integer")
+        if record is True:
+            every = 1
+        elif record is False or record is None or record == 0:
+            every = 0
+        elif isinstance(record, (int, np.integer)) and record > 0:
+            every = int(record)
+        else:
+            raise Exception("Error - record is neither boolean nor non-negative integer")
+        engine = self.engine if self.engine is not None else Engine(self)
+        if store is None:
+            result = engine.run(steps, every)
+        else:
+            if every == 0:
+                raise Exception("Error - trajectory store requires recording")
+            result = self.__store(store, engine.names, engine.dtype)
+            records = steps // every
+            for start in range(0, records, result.block):
+                result.append(engine.run(min(result.block, records - start) * every, every))
+            engine.run(steps - records * every, 0)
+            result.flush()
+        engine.push(self)
+        self.dirty = None
+        return result
+    
+    def run_until_stable(self, tol=1e-6, max_steps=1000, history=100):
+        """Update activation values of all concepts until the map reaches fixed point or limit cycle
+        
+        Arguments:
+        - tol - maximal absolute difference of activation values considered equal (optional)
+        - max_steps - maximal number of simulation steps (optional)
+        - history - number of recent states searched for repetition, i.e. maximal detected period (optional)
+        Returns:
+        - Attractor object with kind ("fixed point", "limit cycle" or "chaotic"), number of steps and period
+        """
+        engine = self.engine if self.engine is not None else Engine(self)
+        result = engine.converge(tol, max_steps, history)
+        engine.push(self)
+        self.dirty = None
+        return result
+    
+    def fit(self, X, Y, epochs=10, batch_size=32, lr=0.1):
+        """Learn weights of RSimpleSigmoid relations from pairs of consecutive states via mini-batch gradient descent
+        
+        Arguments:
+        - X - array of states in time "t" (samples x concepts) with columns given by columns()
+        - Y - array of states in time "t+1" (samples x concepts) with columns given by columns()
+        - epochs - number of passes over training data (optional)
+        - batch_size - number of state pairs in single mini-batch (optional)
+        - lr - learning rate (optional)
+        Returns:
+        - numpy array containing mean squared error of each epoch
+        """
+        compiled = self.engine
+        self.decompile()
+        try:
+            engine = Engine(self, compiled.backend if compiled is not None else None)
+            losses = GradientDescent(lr, epochs, batch_size).fit(engine, X, Y)
+            for kernel in engine.kernels:
+                if kernel.trainable:
+                    kernel.store(self)
+        finally:
+            #map is compiled again even if training data were rejected
+            if compiled is not None:
+                self.compile(compiled.backend, getattr(compiled, "workers", None))
+        return losses
+    
+    def evolve(self, states, steps, target=None, fitness=None, population=50, generations=100, bounds=(-1, 1), workers=None, seed=None):
+        """Learn weights of RSimpleSigmoid relations via differential evolution on simulated trajectories
+        
+        Arguments:
+        - states - array of initial states (scenarios x concepts) with columns given by columns()
+        - steps - number of simulation steps
+        - target - desired trajectory (steps x scenarios x concepts) with columns given by columns() (optional)
+        - fitness - function(trajectory, target) returning array of errors of candidates (optional, default mean squared error)
+        - population - number of candidates in population (optional)
+        - generations - maximal number of generations (optional)
+        - bounds - tuple (lower, upper) of allowed weight values (optional)
+        - workers - number of worker processes evaluating population (optional)
+        - seed - seed of random number generator (optional)
+        Returns:
+        - numpy array containing fitness of the best candidate in each generation
+        """
+        compiled = self.engine
+        self.decompile()
+        try:
+            engine = Engine(self, compiled.backend if compiled is not None else None)
+            learning = DifferentialEvolution(population, generations, bounds=bounds, workers=workers, seed=seed)
+            scores = learning.fit(engine, states, steps, target, fitness)
+            for kernel in engine.kernels:
+                if kernel.trainable:
+                    kernel.store(self)
+        finally:
+            #map is compiled again even if learning failed
+            if compiled is not None:
+                self.compile(compiled.backend, getattr(compiled, "workers", None))
+        return scores
+    
+    def hebbian(self, rule="nhl", lr=0.01, decay=0.02, epochs=1000, tol=0.002, target=None):
+        """Learn weights of RSimpleSigmoid relations via nonlinear ("nhl") or active ("ahl") Hebbian learning
+        starting from current concept values, concept values are left untouched
+        
+        Arguments:
+        - rule - learning rule "nhl" or "ahl" (optional)
+        - lr - learning rate (optional)
+        - decay - weight decay (optional)
+        - epochs - maximal number of iterations (optional)
+        - tol - maximal change of output concepts considered stable (optional)
+        - target - dictionary of names of output concepts and their desired values (optional, default all concepts are outputs)
+        Returns:
+        - numpy array containing change of output concepts (or distance from target) in each iteration or raises Error exception
+        """
+        for name in target or []:
+            if name not in self:
+                raise Exception("Error - concept " + str(name) + " does not exist")
+        compiled = self.engine
+        self.decompile()
+        try:
+            engine = Engine(self, compiled.backend if compiled is not None else None)
+            outputs = None if target is None else [engine.index[name] for name in target]
+            values = None if target is None else list(target.values())
+            errors = HebbianLearning(rule, lr, decay, epochs, tol).fit(engine, outputs, values)
+            for kernel in engine.kernels:
+                if kernel.trainable:
+                    kernel.store(self)
+        finally:
+            #map is compiled again even if learning failed
+            if compiled is not None:
+                self.compile(compiled.backend, getattr(compiled, "workers", None))
+        return errors
+    
+    def columns(self):
+        """Return dictionary mapping concept names to columns of state arrays used by run() & simulate_batch()
+        
+        Returns:
+        - dictionary of concept names and column indices
+        """
+        if self.engine is not None:
+            return dict(self.engine.index)
+        return dict([(name, i) for i, name in enumerate(self.keys())])
+    
+    def simulate_batch(self, states, steps, trajectory=False, clamp=None):
+        """Simulate multiple scenarios (initial states) of the map at once, concept values are left untouched
+        
+        Arguments:
+        - states - array of initial states (scenarios x concepts) with columns given by columns()
+        - steps - number of simulation steps
+        - trajectory - return states after each step instead of final states only (optional)
+        - clamp - names of concepts held fixed at their initial values (optional)
+        Returns:
+        - numpy array of final states (scenarios x concepts) or trajectory (steps x scenarios x concepts)
+        """
+        engine = self.engine if self.engine is not None else Engine(self)
+        if clamp is not None:
+            clamp = [engine.index[name] for name in clamp]
+        return engine.simulate(states, steps, trajectory, clamp)
+    
+    def fuzzify(self, values):
+        """Convert raw values of concepts into activation values via their input membership functions (inputMF)
+        
+        Columns are converted at once, concepts with identical functions are converted together by single call.
+        Unset piecewise linear functions are treated as identity.
+        
+        Arguments:
+        - values - array of raw values (... x concepts) with columns given by columns()
+        Returns:
+        - numpy array of activation values (same shape as values)
+        """
+        return self.__convert(values, "_inputMF", self.config.defaultInputMF)
+    
+    def defuzzify(self, values):
+        """Convert activation values of concepts into raw values via their output membership functions (outputMF)
+        
+        Columns are converted at once, concepts with identical functions are converted together by single call.
+        Unset piecewise linear functions are treated as identity.
+        
+        Arguments:
+        - values - array of activation values (... x concepts) with columns given by columns()
+        Returns:
+        - numpy array of raw values (same shape as values)
+        """
+        return self.__convert(values, "_outputMF", self.config.defaultOutputMF)
+    
+    def simulate_raw(self, values, steps, trajectory=False, clamp=None):
+        """Simulate multiple scenarios given by raw values of concepts (fuzzify, simulate & defuzzify), concept values are left untouched
+        
+        Arguments:
+        - values - array of initial raw values (scenarios x concepts) with columns given by columns()
+        - steps - number of simulation steps
+        - trajectory - return states after each step instead of final states only (optional)
+        - clamp - names of concepts held fixed at their initial values (optional)
+        Returns:
+        - numpy array of final raw values (scenarios x concepts) or their trajectory (steps x scenarios x concepts)
+        """
+        return self.defuzzify(self.simulate_batch(self.fuzzify(values), steps, trajectory, clamp))
+    
+    def __convert(self, values, attribute, default):
+        """Apply membership functions given by attribute of concepts to columns of values (unset functions are not created)."""
+        values = np.asarray(values, dtype=float)
+        columns = self.columns()
+        if values.ndim < 1 or values.shape[-1] != len(columns):
+            raise Exception("Error - values must have " + str(len(columns)) + " columns")
+        #group columns by identical functions
+        groups = {}
+        shared = None
+        for name, column in columns.items():
+            function = getattr(self[name], attribute, None)
+            #concepts without own function share single default instance
+            if function is None:
+                if shared is None:
+                    shared = default()
+                function = shared
+            if isinstance(function, self.config.functions.PiecewiseLinear) and not function.piece:
+                continue
+            key = (type(function), repr(function))
+            groups.setdefault(key, (function, []))[1].append(column)
+        result = values.copy()
+        for function, group in groups.values():
+            result[..., group] = function.evaluate_array(values[..., group])
+        return result
+    
+    def sweep(self, clamp, outputs=None, tol=1e-6, max_steps=1000, workers=None, chunk=None):
+        """Run the map to steady state for each combination of values of clamped concepts (Cartesian grid)
+        
+        Clamped concepts are held fixed during the simulation, other concepts start from their current values.
+        Concept values are left untouched. Scenarios are simulated in batches, optionally by pool of worker processes.
+        
+        Arguments:
+        - clamp - dictionary of names of clamped concepts and lists of their values
+        - outputs - names of reported concepts (optional, default all concepts)
+        - tol - maximal absolute difference of activation values considered equal (optional)
+        - max_steps - maximal number of simulation steps, scenarios not stable after max_steps report NaN values of non-clamped concepts (optional)
+        - workers - number of worker processes (optional)
+        - chunk - number of scenarios simulated by single batch (optional, default grid is split evenly among workers)
+        Returns:
+        - numpy structured array with field for each clamped and reported concept (one item per grid point, last clamped concept varies fastest)
+          or raises Error exception
+        """
+        if len(clamp) == 0:
+            raise Exception("Error - no clamped concepts")
+        for name in clamp:
+            if name not in self:
+                raise Exception("Error - concept " + str(name) + " does not exist")
+            if len(clamp[name]) == 0:
+                raise Exception("Error - no values of clamped concept " + str(name))
+        if workers is not None and workers < 1:
+            raise Exception("Error - workers must be positive integer")
+        if chunk is not None and chunk < 1:
+            raise Exception("Error - chunk must be positive integer")
+        if outputs is None:
+            outputs = list(self.keys())
+        for name in outputs:
+            if name not in self:
+                raise Exception("Error - concept " + str(name) + " does not exist")
+        engine = Engine(self, self.engine.backend if self.engine is not None else None)
+        columns = [engine.index[name] for name in clamp]
+        grid = np.meshgrid(*[np.asarray(values, dtype=float) for values in clamp.values()], indexing="ij")
+        states = np.repeat(engine.state[np.newaxis], grid[0].size, axis=0)
+        states[:, columns] = np.stack([values.ravel() for values in grid], axis=-1)
+        #split grid into batches
+        if workers is None:
+            workers = 1
+        if chunk is None:
+            chunk = -(-len(states) // workers)
+        batches = [states[start:start + chunk] for start in range(0, len(states), chunk)]
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as executor:
+                results = list(executor.map(engine.settle, batches, repeat(tol), repeat(max_steps), repeat(columns)))
+        else:
+            results = [engine.settle(batch, tol, max_steps, columns) for batch in batches]
+        final = np.concatenate([result[0] for result in results])
+        reached = np.concatenate([result[1] for result in results])
+        #structured result (unstable scenarios are marked by NaN values of reported concepts)
+        names = list(clamp) + [name for name in outputs if name not in clamp]
+        result = np.empty(len(final), dtype=[(name, float) for name in names])
+        for name in names:
+            result[name] = final[:, engine.index[name]]
+            if name not in clamp:
+                result[name][reached < 0] = np.nan
+        return result
+    
+    def stream(self, inputs, outputs=None, columns=None, chunk=None, incremental=False, store=None):
+        """Simulate the map driven by stream of values of exogenous (input) concepts
+        
+        For each item of inputs, values of input concepts are set, the map is updated by single
+        simulation step via update() and values of output concepts are yielded. Items are read and
+        results are produced lazily, so memory use does not depend on length of the stream.
+        
+        Arguments:
+        - inputs - iterable of dictionaries {concept name: value} or of rows (array-likes) of values of concepts given by columns,
+                   array (or numpy.memmap) of rows is read by blocks when chunk is set
+        - outputs - names of reported concepts (optional, default all concepts)
+        - columns - names of input concepts corresponding to values of rows (required by row inputs)
+        - chunk - number of rows processed as single block, blocks of results (rows x outputs) are yielded instead of single rows (optional)
+        - incremental - if map is not compiled, recalculate only concepts affected by changes (optional)
+        - store - Trajectory object or path of new trajectory file recording values of output concepts (optional)
+        Returns:
+        - generator of numpy arrays of values of output concepts (ordered as outputs) or raises Error exception
+        """
+        if outputs is None:
+            outputs = list(self.keys())
+        for name in list(outputs) + list(columns or []):
+            if name not in self:
+                raise Exception("Error - concept " + str(name) + " does not exist")
+        if chunk is not None:
+            if columns is None:
+                raise Exception("Error - columns are required by chunked stream")
+            if chunk < 1:
+                raise Exception("Error - chunk must be positive integer")
+        if store is not None:
+            store = self.__store(store, outputs, self.engine.dtype if self.engine is not None else float)
+        if chunk is not None:
+            return self.__streamBlocks(inputs, list(outputs), list(columns), chunk, incremental, store)
+        return self.__streamItems(inputs, list(outputs), columns, incremental, store)
+    
+    def __streamItems(self, inputs, outputs, columns, incremental, store):
+        """Generator of values of output concepts for single input items (see stream())."""
+        try:
+            for item in inputs:
+                self.__apply(item, columns)
+                self.update(False, incremental)
+                values = self.__values(outputs)
+                if store is not None:
+                    store.append(values)
+                yield values
+        finally:
+            self.sync()
+            if store is not None:
+                store.flush()
+    
+    def __streamBlocks(self, inputs, outputs, columns, chunk, incremental, store):
+        """Generator of blocks of values of output concepts for blocks of input rows (see stream())."""
+        if not hasattr(inputs, "shape"):
+            inputs = iter(inputs)
+        start = 0
+        try:
+            while True:
+                if hasattr(inputs, "shape"):
+                    block = np.asarray(inputs[start:start + chunk], dtype=float)
+                    start += chunk
+                else:
+                    block = np.array(list(islice(inputs, chunk)), dtype=float)
+                if len(block) == 0:
+                    return
+                result = np.empty((len(block), len(outputs)))
+                for i, row in enumerate(block.tolist()):
+                    self.__apply(row, columns)
+                    self.update(False, incremental)
+                    result[i] = self.__values(outputs)
+                if store is not None:
+                    store.append(result)
+                yield result
+        finally:
+            self.sync()
+            if store is not None:
+                store.flush()
+    
+    def __store(self, store, names, dtype):
+        """Return Trajectory object for recording of concepts (new trajectory is created for path)."""
+        if not isinstance(store, Trajectory):
+            return Trajectory(store, names, dtype)
+        if store.names != list(names):
+            raise Exception("Error - trajectory records different concepts")
+        return store
+    
+    def __apply(self, item, columns):
+        """Set values of input concepts from dictionary or row of values."""
+        if isinstance(item, dict):
+            #unknown names would add new concepts (and decompile the map)
+            for name in item:
+                if name not in self:
+                    raise Exception("Error - unknown concept " + str(name) + " in input item")
+            for name, value in item.items():
+                self[name] = value
+        elif columns is None:
+            raise Exception("Error - columns are required by row inputs")
+        else:
+            values = item.tolist() if isinstance(item, np.ndarray) else list(item)
+            if len(values) != len(columns):
+                raise Exception("Error - input row must have " + str(len(columns)) + " values")
+            for name, value in zip(columns, values):
+                self[name] = value
+    
+    def __values(self, names):
+        """Return numpy array of current values of concepts."""
+        if self.engine is not None:
+            return self.engine.state[[self.engine.index[name] for name in names]]
+        return np.array([self[name].value for name in names])
+    
     def list(self):
         """Return string containing names of all concepts within the map
         
@@ -263,6 +875,35 @@ class FCM(dict):
             l.sort()
             return ";".join(l)
 
+    def listFollowing(self,name):
+        """Return string containing names of all concepts following single concept specified by name
+        
+        Arguments:
+        - name - concept name
+        Returns:
+        - string containing sorted names of all following concepts separated by semicolons
+        """
+        
+        if (not name) or (not isinstance(name,str)) or (name == ""):
+            raise Exception("Error - name is not string or empty")
+        elif not name in self:
+            raise Exception("Error - there is no concept with name " + name)
+        l=list(self.following.get(name, ()))
+        l.sort()
+        return ";".join(l)
+
+    def reindex(self):
+        """Rebuild index of following concepts from relations (needed after connecting concepts directly via relation objects)
+        
+        Returns:
+        - None or raises Error Exception.
+        """
+        
+        self.dirty = None
+        self.following = {}
+        for name in self:
+            self.__link(name)
+
     def listPreceding(self,name):
         """Return string containing names of all concepts preceding single concept specified by name
         
@@ -292,6 +933,9 @@ class FCM(dict):
         - string containing JSON encoded fuzzy cognitive map
         """
         
+        #preparation (write back and detach compiled engine & incremental update state)
+        self.sync()
+        transient = dict([(k, self.__dict__.pop(k)) for k in ("engine", "dirty", "following", "stateful") if k in self.__dict__])
         #preparation (separate relations to force flat pickle of concepts)
         self.relations=dict()
         for name, concept in self.items():
@@ -312,6 +956,7 @@ class FCM(dict):
         for name, concept in self.items():
             concept.relation = self.relations[name]
         del self.relations
+        self.__dict__.update(transient)
         #return JSON string
         return result
         
@@ -327,15 +972,25 @@ class FCM(dict):
         #deserialize
         new = jsonpickle.decode(string)
         for name, value in new.relations.items():
+            value.index = dict([(prev, i) for i, prev in enumerate(value.previousnames)])
             del value.previousnames
             new[name].relation=value
         del new.relations
         #copy to this object
+        self.decompile()
         self.clear()
-        for name, concept in new.items():
-            self[name]=concept
         self.config=new.config
         self.name=new.name
+        for name, concept in new.items():
+            concept.config=self.config
+            #compiled equations are not serialized, validate & compile them again (including wrapped functions)
+            for function in (concept._inputMF, concept._outputMF):
+                while function is not None:
+                    if isinstance(function, self.config.functions.Predefined):
+                        function.compile()
+                    function = getattr(function, "function", None)
+            dict.__setitem__(self, name, concept)
+        self.reindex()
     
     def save(self,file,indent=4):
         """Save JSON representation of FCM to file
@@ -2,8 +2,10 @@ from .piecewiselinear import PiecewiseLinear
 from .polynome import Polynome
 from .predefined import Predefined
 from .sigmoid import Sigmoid
+from .lookup import LookupTable
 
 del piecewiselinear
 del polynome
 del predefined
-del sigmoid
\ No newline at end of file
+del sigmoid
+del lookup
\ No newline at end of file
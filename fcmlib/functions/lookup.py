@@ -0,0 +1,168 @@
+from fcmlib.interfaces import IFunction
+from fcmlib.functions.sigmoid import Sigmoid
+import numpy as np
+
+class LookupTable(IFunction):
+    """Approximation of other function by linear interpolation of its values sampled over domain.
+       Table is built on first evaluation and rebuilt whenever parameters of wrapped function are changed via its set().
+       Inputs outside of the domain are evaluated by wrapped function.
+
+    Attributes:
+    - function - wrapped function (class IFunction)
+    - low      - lower bound of sampled domain
+    - high     - upper bound of sampled domain
+    - samples  - number of samples
+    - revision - number of parameter changes via set()
+    - cache    - sampled table built by table() (not serialized)
+    """
+
+    function = None
+    low = None
+    high = None
+    samples = None
+    revision = 0
+    cache = None
+
+    def __init__(self, function=None, low=0.0, high=1.0, samples=1024):
+        """Function instantiation operation (constructor).
+
+        Arguments:
+        - function - wrapped function (optional, default Sigmoid)
+        - low      - lower bound of sampled domain (optional)
+        - high     - upper bound of sampled domain (optional)
+        - samples  - number of samples (optional)
+        Returns:
+        - new LookupTable function object or raises Exception.
+        """
+
+        if function is None:
+            function = Sigmoid()
+        self.function = function
+        self.set(str(low)+" "+str(high)+" "+str(samples))
+        
+    def __getstate__(self):
+        """Return state of function for serialization (without sampled table)."""
+        
+        state = dict(self.__dict__)
+        state.pop("cache", None)
+        return state
+        
+    def __setstate__(self, state):
+        """Restore state of function after deserialization (table is sampled again on first evaluation)."""
+        
+        self.__dict__.update(state)
+        self.cache = None
+
+    def __repr__(self):
+        """Return repr(self)."""
+
+        return '%s(%s)' % (type(self).__name__, str(self.function)+" on ["+str(self.low)+","+str(self.high)+"] ("+str(self.samples)+" samples)")
+
+    def info(self):
+        """Return basic information about function.
+
+        Returns:
+        - string containing basic information about function
+        """
+
+        return "Lookup table approximation of function: "+self.function.info()
+
+    def get(self):
+        """Return detailed information about function (aka serialization).
+
+        Returns:
+        - string containing domain bounds and number of samples (low, high, samples) separated by spaces
+        """
+
+        return str(self.low)+" "+str(self.high)+" "+str(self.samples)
+
+    def set(self, params):
+        """Specify sampled domain (parameters of wrapped function are set via its own set()).
+
+        Arguments:
+        - params - string containing domain bounds and number of samples (low, high, samples) separated by spaces
+        Returns:
+        - None or raises Exception.
+        """
+
+        low, high, samples = params.split(" ")
+        low, high, samples = float(low), float(high), int(samples)
+        if not low < high:
+            raise Exception("Error - lower bound of domain must be less than upper bound")
+        if samples < 2:
+            raise Exception("Error - at least 2 samples are required")
+        self.low, self.high, self.samples = low, high, samples
+        self.revision += 1
+        self.cache = None
+
+    def getDerivative(self):
+        """Get function derivative.
+
+        Returns:
+        - LookupTable function approximating derivative of wrapped function over the same domain
+        """
+
+        return LookupTable(self.function.getDerivative(), self.low, self.high, self.samples)
+
+    def evaluate(self, input):
+        """Calculate function output as out=f(in) (interpolated).
+
+        Arguments:
+        - input - function input
+        Returns:
+        - function output
+        """
+
+        if input < self.low or input > self.high:
+            return self.function.evaluate(input)
+        table = self.cache
+        if table is None or table[0] != getattr(self.function, "revision", 0):
+            table = self.table()
+        position = (input - self.low) * table[4]
+        i = min(int(position), self.samples - 2)
+        values = table[3]
+        return values[i] + (values[i+1] - values[i]) * (position - i)
+
+    def evaluate_array(self, input):
+        """Calculate function outputs for array of inputs at once (interpolated).
+
+        Arguments:
+        - input - numpy array (or array-like) of function inputs
+        Returns:
+        - numpy array of function outputs (same shape as input)
+        """
+
+        input = np.asarray(input, dtype=float)
+        table = self.table()
+        output = np.interp(input, table[1], table[2])
+        outside = (input < self.low) | (input > self.high)
+        if np.any(outside):
+            output[outside] = self.function.evaluate_array(input[outside])
+        return output
+
+    def maxError(self):
+        """Return maximal absolute approximation error (measured between samples).
+
+        Returns:
+        - maximal absolute difference of interpolated and exact function output
+        """
+
+        return self.table()[5]
+
+    def table(self):
+        """Return sampled table, (re)build it if it is missing or wrapped function was changed.
+
+        Returns:
+        - tuple (revision of wrapped function, sampled inputs, sampled outputs, sampled outputs as list, samples per unit, maximal error)
+        """
+
+        revision = getattr(self.function, "revision", 0)
+        table = self.cache
+        if table is None or table[0] != revision:
+            x = np.linspace(self.low, self.high, self.samples)
+            y = np.asarray(self.function.evaluate_array(x), dtype=float)
+            #error is measured in the middle and quarters of each interval
+            between = (x[:-1,np.newaxis] + np.array([0.25, 0.5, 0.75]) * (x[1] - x[0])).ravel()
+            error = float(np.max(np.abs(np.interp(between, x, y) - self.function.evaluate_array(between)), initial=0))
+            table = self.cache = (revision, x, y, y.tolist(), (self.samples - 1) / (self.high - self.low), error)
+        return table
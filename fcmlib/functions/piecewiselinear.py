@@ -1,13 +1,25 @@
 ﻿from fcmlib.interfaces import IFunction
+from bisect import bisect_right
+import numpy as np
 
 class PiecewiseLinear(IFunction):
     """Simple piecewise linear function.
     
     Attributes:
-    - piece - list of connected linear functions
+    - piece  - list of connected linear functions
+    - starts - sorted list of x-coordinates of starting points of pieces (breakpoints, not serialized)
+    - slopes - list of slopes of pieces (not serialized)
+    - shifts - list of shifts of pieces (not serialized)
+    - cache  - tuple of numpy arrays (starts, slopes, shifts) used by evaluate_many() (not serialized)
+    - revision - number of parameter changes via set() (not serialized)
     """
     
     piece = None
+    starts = None
+    slopes = None
+    shifts = None
+    cache = None
+    revision = 0
     
     def __init__(self):
         """Function instantiation operation (constructor).
@@ -17,6 +29,24 @@ class PiecewiseLinear(IFunction):
         """
         
         self.piece = []
+        self.reindex()
+        
+    def __getstate__(self):
+        """Return state of function for serialization (without breakpoint arrays)."""
+        
+        state = dict(self.__dict__)
+        for key in ("starts", "slopes", "shifts", "cache", "revision"):
+            state.pop(key, None)
+        return state
+        
+    def __setstate__(self, state):
+        """Restore state of function after deserialization (breakpoint arrays are rebuilt)."""
+        
+        self.__dict__.update(state)
+        #older map files may not contain pieces (unset function)
+        if self.piece is None:
+            self.piece = []
+        self.reindex()
         
     def __repr__(self):
         """Return repr(self)."""
@@ -85,6 +115,9 @@ class PiecewiseLinear(IFunction):
         self.piece = self.points2pieces(pointObjects)
         # merge consequent pieces with same slope
         self.simplify()
+        # build breakpoint arrays
+        self.reindex()
+        self.revision += 1
 
     def getDerivative(self):
         """Get function derivative.
@@ -102,9 +135,10 @@ class PiecewiseLinear(IFunction):
         for p in self.piece:
             start = Point(p.start.x, p.a)
             end = Point(p.end.x, p.a)
-            derivative.piece.append()
+            derivative.piece.append(Piece(start, end))
         # merge consequent pieces with same slope
         derivative.simplify()
+        derivative.reindex()
         # return function derivative
         return derivative
     
@@ -117,12 +151,58 @@ class PiecewiseLinear(IFunction):
         - function output
         """
         
-        if input < self.piece[0].end.x:
-            return self.piece[0].eval(input)
-        for p in self.piece:
-            if input >= p.start.x and input < p.end.x:
-                return p.eval(input)
-        return self.piece[-1].eval(input)
+        if self.starts is None:
+            self.reindex()
+        if len(self.starts) == 0:
+            raise Exception("Error - function is not set")
+        #piece starting at the last breakpoint not greater than input (first or last piece outside of breakpoints)
+        i = min(max(bisect_right(self.starts, input) - 1, 0), len(self.starts) - 1)
+        #constant pieces (including infinite ones) are evaluated without multiplication, so that f(+-inf) is defined
+        if self.slopes[i] == 0:
+            return self.shifts[i]
+        return self.slopes[i] * input + self.shifts[i]
+    
+    def evaluate_many(self, input):
+        """Calculate function outputs for array of inputs at once.
+        
+        Arguments:
+        - input - numpy array (or array-like) of function inputs
+        Returns:
+        - numpy array of function outputs (same shape as input)
+        """
+        
+        if self.cache is None:
+            self.reindex()
+        starts, slopes, shifts = self.cache
+        if len(starts) == 0:
+            raise Exception("Error - function is not set")
+        input = np.asarray(input, dtype=float)
+        i = np.clip(np.searchsorted(starts, input, side="right") - 1, 0, len(starts) - 1)
+        slopes = slopes[i]
+        shifts = shifts[i]
+        #constant pieces (including infinite ones) ignore input, so that f(+-inf) is defined
+        return slopes * np.where(slopes == 0, 0, input) + shifts
+    
+    def evaluate_array(self, input):
+        """Calculate function outputs for array of inputs at once (same as evaluate_many()).
+        
+        Arguments:
+        - input - numpy array (or array-like) of function inputs
+        Returns:
+        - numpy array of function outputs (same shape as input)
+        """
+        
+        return self.evaluate_many(input)
+    
+    def reindex(self):
+        """Rebuild sorted breakpoint arrays (starts, slopes & shifts) from function pieces.
+           Called by set() and getDerivative(), must be called after pieces are modified directly.
+        """
+        
+        self.starts = [p.start.x for p in self.piece]
+        self.slopes = [p.a for p in self.piece]
+        self.shifts = [p.b for p in self.piece]
+        self.cache = (np.array(self.starts, dtype=float), np.array(self.slopes, dtype=float), np.array(self.shifts, dtype=float))
     
     def simplify(self):
         """Remove unnecessary breakpoints (if two consequent pieces have the same slope 'a', merge them into one piece)."""
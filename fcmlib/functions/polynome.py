@@ -1,13 +1,16 @@
 ﻿from fcmlib.interfaces import IFunction
+import numpy as np
 
 class Polynome(IFunction):
     """Simple polynomial function.
     
     Attributes:
     - coefficients - list of polynome coefficients
+    - revision - number of parameter changes via set()
     """
     
     coefficients = None
+    revision = 0
     
     def __init__(self):
         """Function instantiation operation (constructor).
@@ -57,6 +60,7 @@ class Polynome(IFunction):
         
         new_coefficients = params.split(" ")
         self.coefficients = [float(c) for c in new_coefficients]
+        self.revision += 1
 
     def getDerivative(self):
         """Get function derivative.
@@ -81,10 +85,20 @@ class Polynome(IFunction):
         - function output
         """
         
-        res=self.coefficients[-1]
-        power=1
-        for c in self.coefficients[-2::-1]:
-            res+=c*(input**power)
-            power+=1
+        #Horner's scheme (coefficients are ordered from the highest power)
+        res=0
+        for c in self.coefficients:
+            res=res*input+c
         return res
+    
+    def evaluate_array(self, input):
+        """Calculate function outputs for array of inputs at once.
+        
+        Arguments:
+        - input - numpy array (or array-like) of function inputs
+        Returns:
+        - numpy array of function outputs (same shape as input)
+        """
+        
+        return np.polyval(self.coefficients, np.asarray(input, dtype=float))
     
\ No newline at end of file
@@ -1,5 +1,6 @@
 ﻿from fcmlib.interfaces import IFunction
 from math import *
+import numpy as np
 
 #list of safe functions
 _safe_list_ = ['acos', 'asin', 'atan', 'atan2', 'ceil', 'cos', 'cosh',
@@ -10,6 +11,16 @@ _safe_list_ = ['acos', 'asin', 'atan', 'atan2', 'ceil', 'cos', 'cosh',
 _safe_dict_ = dict([ (k, globals().get(k, None)) for k in _safe_list_ ])
 #add necessary builtins back in.
 _safe_dict_['abs'] = abs
+#numpy (vectorized) variants of safe functions
+_numpy_dict_ = {'acos': np.arccos, 'asin': np.arcsin, 'atan': np.arctan, 'atan2': np.arctan2, 'ceil': np.ceil,
+                'cos': np.cos, 'cosh': np.cosh, 'degrees': np.degrees, 'e': np.e, 'exp': np.exp, 'fabs': np.fabs,
+                'floor': np.floor, 'fmod': np.fmod, 'frexp': np.frexp, 'hypot': np.hypot, 'ldexp': np.ldexp,
+                'log': np.log, 'log10': np.log10, 'modf': np.modf, 'pi': np.pi, 'pow': np.power,
+                'radians': np.radians, 'sin': np.sin, 'sinh': np.sinh, 'sqrt': np.sqrt, 'tan': np.tan,
+                'tanh': np.tanh, 'abs': np.abs}
+#evaluation namespaces
+_safe_globals_ = {"__builtins__": _safe_dict_}
+_numpy_globals_ = {"__builtins__": _numpy_dict_}
 
 
 class Predefined(IFunction):
@@ -18,10 +29,14 @@ class Predefined(IFunction):
     Attributes:
     - equation - function equation
     - derivative - function derivative
+    - revision - number of parameter changes via set()
+    - cache - dictionary of compiled equation strings {attribute: (equation string, code object)} (not serialized)
     """
     
     equation = None
     derivative = None
+    revision = 0
+    cache = None
     
     def __init__(self):
         """Function instantiation operation (constructor).
@@ -32,6 +47,20 @@ class Predefined(IFunction):
         
         self.equation = "x"
         
+    def __getstate__(self):
+        """Return state of function for serialization (without compiled equations)."""
+        
+        state = dict(self.__dict__)
+        state.pop("cache", None)
+        return state
+        
+    def __setstate__(self, state):
+        """Restore state of function after deserialization (equations are validated & compiled again)."""
+        
+        self.__dict__.update(state)
+        self.cache = None
+        self.compile()
+        
     def __repr__(self):
         """Return repr(self)."""
         
@@ -64,10 +93,12 @@ class Predefined(IFunction):
         - None or raises Exception.
         """
         
-        #test evaluation for x=1
-        self._safeeval_(params.replace("^","**"),1)
+        #compile & test evaluation for x=1
+        code = self._compile_(params)
         #set equation string
         self.equation = params
+        self.__cache()["equation"] = (params, code)
+        self.revision += 1
         
     def setDerivative(self, params):
         """Specify function derivative via predefined equation string.
@@ -78,10 +109,22 @@ class Predefined(IFunction):
         - None or raises Exception.
         """
         
-        #test evaluation for x=1
-        self._safeeval_(params.replace("^","**"),1)
+        #compile & test evaluation for x=1
+        code = self._compile_(params)
         #set equation string
         self.derivative = params
+        self.__cache()["derivative"] = (params, code)
+    
+    def compile(self):
+        """Compile (and validate) equation strings, e.g. after deserialization of function.
+        
+        Returns:
+        - None or raises Exception.
+        """
+        
+        self.__code("equation")
+        if self.derivative is not None:
+            self.__code("derivative")
 
     def getDerivative(self):
         """Get function derivative.
@@ -105,11 +148,47 @@ class Predefined(IFunction):
         - function output
         """
         
-        x=input
-        return self._safeeval_(self.equation.replace("^","**"),x)
+        return eval(self.__code("equation"),_safe_globals_,{"x":input})
+    
+    def evaluate_array(self, input):
+        """Calculate function outputs for array of inputs at once (equation is evaluated with numpy functions).
+        
+        Arguments:
+        - input - numpy array (or array-like) of function inputs
+        Returns:
+        - numpy array of function outputs (same shape as input) or raises Exception
+        """
+        
+        x=np.asarray(input, dtype=float)
+        output=eval(self.__code("equation"),_numpy_globals_,{"x":x})
+        #functions returning pairs (frexp, modf) give tuple of arrays instead of outputs
+        if isinstance(output, tuple):
+            raise Exception("Error - equation "+self.equation+" does not evaluate to single number")
+        #constant equations are broadcast to shape of input
+        return np.zeros_like(x)+output
         
     def _safeeval_(self,user_func,x):
         """Safe evaluation of expressions"""
         return eval(user_func,{"__builtins__":_safe_dict_},{"x":x})
+    
+    def _compile_(self,user_func):
+        """Compile equation string into code object and test its safe evaluation for x=1"""
+        code = compile(user_func.replace("^","**"),"<equation>","eval")
+        eval(code,_safe_globals_,{"x":1})
+        return code
+    
+    def __cache(self):
+        """Return dictionary of compiled equations, create it if it is missing"""
+        if self.cache is None:
+            self.cache = {}
+        return self.cache
+    
+    def __code(self, attribute):
+        """Return cached code object of equation string stored in attribute, compile it if cache is missing or outdated"""
+        source = getattr(self, attribute)
+        entry = self.cache.get(attribute) if self.cache is not None else None
+        if entry is None or entry[0] != source:
+            entry = self.__cache()[attribute] = (source, self._compile_(source))
+        return entry[1]
 
     
\ No newline at end of file
@@ -1,6 +1,7 @@
 ﻿from fcmlib.interfaces import IFunction
 from fcmlib.functions.predefined import Predefined
 from math import exp
+import numpy as np
 
 class Sigmoid(IFunction):
     """Simple sigmoid function.
@@ -9,11 +10,13 @@ class Sigmoid(IFunction):
     - slope - sigmoid slope
     - center - sigmoid center on x-axis
     - maximum - maximum y value
+    - revision - number of parameter changes via set()
     """
     
     slope = None
     center = None
     maximum = None
+    revision = 0
     
     def __init__(self):
         """Function instantiation operation (constructor).
@@ -62,6 +65,7 @@ class Sigmoid(IFunction):
         """
         
         self.maximum, self.slope, self.center = [float(c) for c in params.split(" ")]
+        self.revision += 1
 
     def getDerivative(self):
         """Get function derivative.
@@ -92,4 +96,16 @@ class Sigmoid(IFunction):
         """
         
         return self.maximum/(1+exp(-self.slope*(input-self.center)))
+    
+    def evaluate_array(self, input):
+        """Calculate function outputs for array of inputs at once.
+        
+        Arguments:
+        - input - numpy array (or array-like) of function inputs
+        Returns:
+        - numpy array of function outputs (same shape as input)
+        """
+        
+        with np.errstate(over='ignore'):
+            return self.maximum/(1+np.exp(-self.slope*(np.asarray(input, dtype=float)-self.center)))
     
\ No newline at end of file
@@ -56,6 +56,17 @@ class IFunction(ABC):
         - output as output=f(input)
         """
         pass
+    
+    @abstractmethod
+    def evaluate_array(self,input):
+        """Calculate function outputs for array of inputs at once (vectorized).
+        
+        Arguments:
+        - input - numpy array (or array-like) of real values used as inputs of the function.
+        Returns:
+        - numpy array of outputs (same shape as input)
+        """
+        pass
 
 class IRelation(ABC):
     """Interface for MISO relation (multiple input, single output) between preceding concepts and single following concept."""
@@ -124,6 +135,24 @@ class IRelation(ABC):
         """
         pass
         
+    def rename(self, currentname, newname):
+        """Rename attached preceding concept within the relation.
+           Default implementation re-keys index of preceding concepts (attribute index), if the relation keeps one.
+        
+        Arguments:
+        - currentname - current name of the preceding concept
+        - newname - new name of the preceding concept
+        Returns:
+        - None or raises Error.
+        """
+        
+        index = getattr(self, "index", None)
+        if index is None:
+            return
+        if currentname not in index:
+            raise Exception("Error - concept with name was not found in the relation")
+        index[newname] = index.pop(currentname)
+        
     @abstractmethod
     def propagate(self):
         """Propagate inputs through relation and calculate new value for the following concept.
@@ -155,3 +184,132 @@ class IRelation(ABC):
         - None or raises Error.
         """
         pass
+
+class IKernel(ABC):
+    """Interface for compiled (vectorized) form of FCM relations of single type, used by FCM simulation engine.
+    
+    Attributes:
+    - targets    - array of state vector indices of following concepts calculated by the kernel
+    - history    - internal state of stateful kernels (None for stateless kernels)
+    - selectable - kernel supports connections() & select() (needed for parallel evaluation)
+    - trainable  - kernel supports gradient(), edges(), assign() & store() (needed for learning)
+    """
+    
+    selectable = False
+    trainable = False
+    
+    @abstractmethod
+    def __repr__(self):
+        """Return repr(self)."""
+        pass
+    
+    @property
+    @abstractmethod
+    def targets(self):
+        """State vector indices of following concepts."""
+        pass
+    
+    @property
+    @abstractmethod
+    def history(self):
+        """Internal state of stateful kernel (None for stateless kernel)."""
+        pass
+        
+    @abstractmethod
+    def info(self):
+        """Return kernel information.
+        
+        Returns:
+        - string containing kernel information.
+        """
+        pass
+
+    @abstractmethod
+    def propagate(self, state):
+        """Propagate state through compiled relations and calculate new values of following concepts.
+        
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        Returns:
+        - numpy array containing new activation values of following concepts (in order of targets)
+        """
+        pass
+
+    @abstractmethod
+    def reset(self, state):
+        """Initialize history of stateful kernel for provided (batch of) states.
+        
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        Returns:
+        - None or raises Error.
+        """
+        pass
+
+    @abstractmethod
+    def push(self, fcm):
+        """Write history of stateful kernel back to compiled relations.
+        
+        Arguments:
+        - fcm - compiled FCM object
+        Returns:
+        - None or raises Error.
+        """
+        pass
+
+    def connections(self):
+        """Return compiled connections.
+        
+        Returns:
+        - tuple of arrays (state vector indices of following concepts, state vector indices of preceding concepts) or raises Error.
+        """
+        raise Exception("Error - kernel " + type(self).__name__ + " does not support connections()")
+
+    def select(self, rows):
+        """Return kernel restricted to selected following concepts.
+        
+        Arguments:
+        - rows - array of positions of selected following concepts within targets
+        Returns:
+        - new kernel object or raises Error.
+        """
+        raise Exception("Error - kernel " + type(self).__name__ + " does not support select()")
+
+    def gradient(self, state, delta):
+        """Calculate gradient of weights for batch of states.
+        
+        Arguments:
+        - state - 2-D numpy array of states (batch x concepts)
+        - delta - 2-D numpy array of error signals of following concepts (batch x targets)
+        Returns:
+        - numpy array of weight gradients (same shape as weights) or raises Error.
+        """
+        raise Exception("Error - kernel " + type(self).__name__ + " does not support gradient()")
+
+    def edges(self):
+        """Return weights of compiled connections.
+        
+        Returns:
+        - numpy array of weights (one per connection) or raises Error.
+        """
+        raise Exception("Error - kernel " + type(self).__name__ + " does not support edges()")
+
+    def assign(self, weights):
+        """Set weights of compiled connections.
+        
+        Arguments:
+        - weights - array of weights (one per connection)
+        Returns:
+        - None or raises Error.
+        """
+        raise Exception("Error - kernel " + type(self).__name__ + " does not support assign()")
+
+    def store(self, fcm):
+        """Write compiled weights back to relations.
+        
+        Arguments:
+        - fcm - compiled FCM object
+        Returns:
+        - None or raises Error.
+        """
+        raise Exception("Error - kernel " + type(self).__name__ + " does not support store()")
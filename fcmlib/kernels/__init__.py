@@ -0,0 +1,11 @@
+from .csr import KCSR
+from .dense import KDense
+from .sparse import KSparse
+from .neural import KNeural
+from .threeterm import K3Term
+
+del csr
+del dense
+del sparse
+del neural
+del threeterm
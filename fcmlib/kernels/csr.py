@@ -0,0 +1,87 @@
+from fcmlib.interfaces import IKernel
+from abc import abstractmethod
+import numpy as np
+
+class KCSR(IKernel):
+    """Base of kernels whose connections are indexed in CSR (compressed sparse row) format.
+       Provides bookkeeping of connections shared by dense and sparse storage of weights.
+       
+    Attributes:
+    - names   - list of names of following concepts
+    - indptr  - array of offsets of the first connection of each following concept (length = targets + 1)
+    - indices - array of state vector indices of preceding concepts (one per connection, in order of relations)
+    """
+    
+    selectable = True
+    names = None
+    indptr = None
+    indices = None
+    
+    def connections(self):
+        """Return compiled connections.
+        
+        Returns:
+        - tuple of arrays (state vector indices of following concepts, state vector indices of preceding concepts)
+        """
+        
+        return self.targets[self.rows()], self.indices
+        
+    def rows(self):
+        """Return positions of following concepts (within targets) of all connections.
+        
+        Returns:
+        - numpy array of positions (one per connection)
+        """
+        
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        
+    def propagate(self, state, weights=None):
+        """Propagate state through compiled relations and calculate new values of following concepts.
+        
+        Arguments:
+        - state   - numpy array containing activation values of all concepts
+        - weights - array of weights of connections (one per connection, ordered as indices) broadcast against state,
+                    e.g. weights of multiple candidates (optional, default weights of the kernel)
+        Returns:
+        - numpy array containing new activation values of following concepts
+        """
+        
+        if weights is None:
+            weights = self.edges()
+        #gather & multiply inputs of all connections, then sum them for each following concept
+        products = state[..., self.indices] * weights
+        sums = np.add.reduceat(products, self.indptr[:-1], axis=-1)
+        with np.errstate(over='ignore'):
+            return 1 / (1 + np.exp(-sums))
+        
+    def select(self, rows):
+        """Return kernel restricted to selected following concepts.
+        
+        Arguments:
+        - rows - array of positions of selected following concepts within targets
+        Returns:
+        - new kernel object of the same type
+        """
+        
+        rows = np.asarray(rows, dtype=np.intp)
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        edges = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+        kernel = type(self).__new__(type(self))
+        kernel.targets = self.targets[rows]
+        kernel.names = [self.names[row] for row in rows]
+        kernel.indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.intp)
+        kernel.indices = self.indices[edges]
+        self.restrict(kernel, rows, edges)
+        return kernel
+        
+    @abstractmethod
+    def restrict(self, kernel, rows, edges):
+        """Copy weights of selected following concepts into kernel created by select().
+        
+        Arguments:
+        - kernel - new kernel object
+        - rows   - array of positions of selected following concepts within targets
+        - edges  - array of positions of their connections
+        """
+        pass
@@ -0,0 +1,138 @@
+from fcmlib.kernels.csr import KCSR
+import numpy as np
+
+class KDense(KCSR):
+    """Compiled form of RSimpleSigmoid relations stored as dense weight matrix.
+       New values of all following concepts are calculated by single matrix product and vectorized sigmoid.
+       
+    Attributes:
+    - targets - array of state vector indices of following concepts
+    - history - None (kernel is stateless)
+    - names   - list of names of following concepts
+    - indptr  - array of offsets of the first connection of each following concept (length = targets + 1)
+    - indices - array of state vector indices of preceding concepts (one per connection, in order of relations)
+    - weights - dense weight matrix (row for each following concept, column for each concept of the map)
+    - mask    - boolean matrix of existing connections (same shape as weights)
+    """
+    
+    targets = None
+    history = None
+    names = None
+    indptr = None
+    indices = None
+    trainable = True
+    weights = None
+    mask = None
+    
+    def __init__(self, fcm, names, index):
+        """Kernel instantiation operation (constructor).
+        
+        Arguments:
+        - fcm   - FCM object containing compiled concepts
+        - names - names of following concepts with RSimpleSigmoid relations
+        - index - dictionary mapping concept names to state vector indices
+        Returns:
+        - new KDense kernel object.
+        """
+        
+        indptr = [0]
+        indices = []
+        self.targets = np.array([index[name] for name in names], dtype=np.intp)
+        self.names = list(names)
+        self.weights = np.zeros((len(names), len(index)), dtype=fcm.config.precision)
+        self.mask = np.zeros((len(names), len(index)), dtype=bool)
+        for row, name in enumerate(names):
+            relation = fcm[name].relation
+            for concept, weight in zip(relation.previous, relation.weights):
+                indices.append(index[concept.name])
+                self.weights[row, indices[-1]] = weight
+                self.mask[row, indices[-1]] = True
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.intp)
+        self.indices = np.array(indices, dtype=np.intp)
+        
+    def __repr__(self):
+        """Return repr(self)."""
+        
+        return '%s(%s)' % (type(self).__name__, str(self.weights.shape))
+        
+    def info(self):
+        """Kernel information.
+        
+        Returns:
+        - Return kernel information.
+        """
+        
+        return "Compiled RSimpleSigmoid relations stored as dense weight matrix"
+        
+    def restrict(self, kernel, rows, edges):
+        """Copy weights of selected following concepts into kernel created by select()."""
+        
+        kernel.weights = self.weights[rows]
+        kernel.mask = self.mask[rows]
+        
+    def propagate(self, state, weights=None):
+        """Propagate state through compiled relations and calculate new values of following concepts.
+        
+        Arguments:
+        - state   - numpy array containing activation values of all concepts
+        - weights - array of weights of connections (one per connection, ordered as indices) broadcast against state (optional, default weight matrix)
+        Returns:
+        - numpy array containing new activation values of following concepts
+        """
+        
+        if weights is not None:
+            return KCSR.propagate(self, state, weights)
+        with np.errstate(over='ignore'):
+            return 1 / (1 + np.exp(-np.dot(state, self.weights.T)))
+        
+    def gradient(self, state, delta):
+        """Calculate gradient of weights for batch of states (only existing connections have non-zero gradient).
+        
+        Arguments:
+        - state - 2-D numpy array of states (batch x concepts)
+        - delta - 2-D numpy array of error signals of following concepts (batch x targets)
+        Returns:
+        - numpy array of weight gradients (same shape as weights)
+        """
+        
+        return np.dot(delta.T, state) * self.mask
+        
+    def reset(self, state):
+        """Initialize history for provided states (kernel is stateless)."""
+        
+        pass
+        
+    def push(self, fcm):
+        """Write history back to relations (kernel is stateless)."""
+        
+        pass
+        
+    def edges(self):
+        """Return weights of compiled connections.
+        
+        Returns:
+        - numpy array of weights (one per connection, ordered as indices)
+        """
+        
+        return self.weights[self.rows(), self.indices]
+        
+    def assign(self, weights):
+        """Set weights of compiled connections.
+        
+        Arguments:
+        - weights - array of weights (one per connection, ordered as indices)
+        """
+        
+        self.weights[self.rows(), self.indices] = weights
+        
+    def store(self, fcm):
+        """Write compiled weights back to RSimpleSigmoid relations.
+        
+        Arguments:
+        - fcm - compiled FCM object
+        """
+        
+        for row, name in enumerate(self.names):
+            columns = self.indices[self.indptr[row]:self.indptr[row + 1]]
+            fcm[name].relation.weights = self.weights[row, columns].tolist()
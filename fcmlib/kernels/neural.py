@@ -0,0 +1,76 @@
+from fcmlib.interfaces import IKernel
+import numpy as np
+
+class KNeural(IKernel):
+    """Compiled form of RNeural relations with identical architecture (same layer shapes).
+       Weights of all relations are stacked into 3-D arrays and each layer of all networks is evaluated by single einsum.
+       
+    Attributes:
+    - targets - array of state vector indices of following concepts
+    - history - None (kernel is stateless)
+    - sources - 2-D array of state vector indices of preceding concepts (row for each following concept)
+    - weights - list of stacked layer weights, each of shape (following concepts, neurons, inputs)
+    """
+    
+    targets = None
+    history = None
+    sources = None
+    weights = None
+    
+    def __init__(self, fcm, names, index):
+        """Kernel instantiation operation (constructor).
+        
+        Arguments:
+        - fcm   - FCM object containing compiled concepts
+        - names - names of following concepts with RNeural relations of identical layer shapes
+        - index - dictionary mapping concept names to state vector indices
+        Returns:
+        - new KNeural kernel object.
+        """
+        
+        relations = [fcm[name].relation for name in names]
+        self.targets = np.array([index[name] for name in names], dtype=np.intp)
+        self.sources = np.array([[index[concept.name] for concept in relation.previous] for relation in relations], dtype=np.intp)
+        self.weights = [np.stack([relation.weights[layer] for relation in relations]).astype(fcm.config.precision) for layer in range(len(relations[0].weights))]
+        
+    def __repr__(self):
+        """Return repr(self)."""
+        
+        return '%s(%s)' % (type(self).__name__, str([w.shape for w in self.weights]))
+        
+    def info(self):
+        """Kernel information.
+        
+        Returns:
+        - Return kernel information.
+        """
+        
+        return "Compiled RNeural relations with identical architecture stored as stacked layer weights"
+        
+    def propagate(self, state):
+        """Propagate state through compiled relations and calculate new values of following concepts.
+        
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        Returns:
+        - numpy array containing new activation values of following concepts
+        """
+        
+        #activations of input layer (..., networks, inputs)
+        activations = state[..., self.sources]
+        #propagate through each layer of all networks at once
+        with np.errstate(over='ignore'):
+            for weights in self.weights:
+                activations = 1 / (1 + np.exp(-np.einsum('gni,...gi->...gn', weights, activations)))
+        #return activation of output neurons
+        return activations[..., 0]
+        
+    def reset(self, state):
+        """Initialize history for provided states (kernel is stateless)."""
+        
+        pass
+        
+    def push(self, fcm):
+        """Write history back to relations (kernel is stateless)."""
+        
+        pass
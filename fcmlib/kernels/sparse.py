@@ -0,0 +1,124 @@
+from fcmlib.kernels.csr import KCSR
+import numpy as np
+
+class KSparse(KCSR):
+    """Compiled form of RSimpleSigmoid relations stored as sparse weight matrix in CSR (compressed sparse row) format.
+       New values of following concepts are calculated by vectorized gather, multiply & reduce over connections.
+       
+    Attributes:
+    - targets - array of state vector indices of following concepts
+    - history - None (kernel is stateless)
+    - names   - list of names of following concepts
+    - indptr  - array of offsets of the first connection of each following concept (length = targets + 1)
+    - indices - array of state vector indices of preceding concepts (one per connection)
+    - weights - array of connection weights (one per connection)
+    """
+    
+    targets = None
+    history = None
+    names = None
+    indptr = None
+    indices = None
+    trainable = True
+    weights = None
+    
+    def __init__(self, fcm, names, index):
+        """Kernel instantiation operation (constructor).
+        
+        Arguments:
+        - fcm   - FCM object containing compiled concepts
+        - names - names of following concepts with RSimpleSigmoid relations
+        - index - dictionary mapping concept names to state vector indices
+        Returns:
+        - new KSparse kernel object.
+        """
+        
+        indptr = [0]
+        indices = []
+        weights = []
+        for name in names:
+            relation = fcm[name].relation
+            indices.extend([index[concept.name] for concept in relation.previous])
+            weights.extend(relation.weights)
+            indptr.append(len(indices))
+        self.targets = np.array([index[name] for name in names], dtype=np.intp)
+        self.names = list(names)
+        self.indptr = np.array(indptr, dtype=np.intp)
+        self.indices = np.array(indices, dtype=np.intp)
+        self.weights = np.array(weights, dtype=fcm.config.precision)
+        
+    def __repr__(self):
+        """Return repr(self)."""
+        
+        return '%s(%s)' % (type(self).__name__, str((len(self.targets), len(self.weights))))
+        
+    def info(self):
+        """Kernel information.
+        
+        Returns:
+        - Return kernel information.
+        """
+        
+        return "Compiled RSimpleSigmoid relations stored as sparse weight matrix (CSR)"
+        
+    def restrict(self, kernel, rows, edges):
+        """Copy weights of selected following concepts into kernel created by select()."""
+        
+        kernel.weights = self.weights[edges]
+        
+    def propagate(self, state, weights=None):
+        """Propagate state through compiled relations and calculate new values of following concepts (see KCSR.propagate())."""
+        
+        return KCSR.propagate(self, state, self.weights if weights is None else weights)
+        
+    def gradient(self, state, delta):
+        """Calculate gradient of weights for batch of states.
+        
+        Arguments:
+        - state - 2-D numpy array of states (batch x concepts)
+        - delta - 2-D numpy array of error signals of following concepts (batch x targets)
+        Returns:
+        - numpy array of weight gradients (one per connection)
+        """
+        
+        rows = self.rows()
+        return np.einsum('be,be->e', delta[:, rows], state[:, self.indices])
+        
+    def reset(self, state):
+        """Initialize history for provided states (kernel is stateless)."""
+        
+        pass
+        
+    def push(self, fcm):
+        """Write history back to relations (kernel is stateless)."""
+        
+        pass
+        
+    def edges(self):
+        """Return weights of compiled connections.
+        
+        Returns:
+        - numpy array of weights (one per connection, ordered as indices)
+        """
+        
+        return self.weights.copy()
+        
+    def assign(self, weights):
+        """Set weights of compiled connections.
+        
+        Arguments:
+        - weights - array of weights (one per connection, ordered as indices)
+        """
+        
+        self.weights[:] = weights
+        
+    def store(self, fcm):
+        """Write compiled weights back to RSimpleSigmoid relations.
+        
+        Arguments:
+        - fcm - compiled FCM object
+        """
+        
+        weights = self.weights.tolist()
+        for row, name in enumerate(self.names):
+            fcm[name].relation.weights = weights[self.indptr[row]:self.indptr[row + 1]]
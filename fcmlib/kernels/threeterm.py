@@ -0,0 +1,122 @@
+from fcmlib.interfaces import IKernel
+import numpy as np
+
+class K3Term(IKernel):
+    """Compiled form of R3Term relations stored as connection-aligned arrays (CSR layout).
+       Three weight sets and three history signals (P, D & A) of all connections are updated by few array operations per step.
+       
+    Attributes:
+    - targets  - array of state vector indices of following concepts
+    - names    - list of names of following concepts
+    - indptr   - array of offsets of the first connection of each following concept (length = targets + 1)
+    - indices  - array of state vector indices of preceding concepts (one per connection)
+    - pweights - array of proportional   (P) weights (one per connection)
+    - dweights - array of differential   (D) weights (one per connection)
+    - aweights - array of moving-average (A) weights (one per connection)
+    - awindow  - array of time windows used to calculate moving average (one per connection)
+    - history  - tuple of arrays of (P, D, A) values of connections, shape (..., connections)
+    """
+    
+    targets = None
+    names = None
+    indptr = None
+    indices = None
+    pweights = None
+    dweights = None
+    aweights = None
+    awindow = None
+    history = None
+    
+    def __init__(self, fcm, names, index):
+        """Kernel instantiation operation (constructor).
+        
+        Arguments:
+        - fcm   - FCM object containing compiled concepts
+        - names - names of following concepts with R3Term relations
+        - index - dictionary mapping concept names to state vector indices
+        Returns:
+        - new K3Term kernel object.
+        """
+        
+        indptr = [0]
+        indices = []
+        weights = ([], [], [])
+        values = ([], [], [])
+        awindow = []
+        for name in names:
+            relation = fcm[name].relation
+            indices.extend([index[concept.name] for concept in relation.previous])
+            for array, source in zip(weights + values, (relation.pweights, relation.dweights, relation.aweights, relation.pvalues, relation.dvalues, relation.avalues)):
+                array.extend(source)
+            awindow.extend([relation.awindow] * len(relation.previous))
+            indptr.append(len(indices))
+        self.targets = np.array([index[name] for name in names], dtype=np.intp)
+        self.names = list(names)
+        self.indptr = np.array(indptr, dtype=np.intp)
+        self.indices = np.array(indices, dtype=np.intp)
+        self.pweights, self.dweights, self.aweights = [np.array(w, dtype=fcm.config.precision) for w in weights]
+        self.awindow = np.array(awindow, dtype=fcm.config.precision)
+        self.history = tuple([np.array(v, dtype=fcm.config.precision) for v in values])
+        
+    def __repr__(self):
+        """Return repr(self)."""
+        
+        return '%s(%s)' % (type(self).__name__, str((len(self.targets), len(self.indices))))
+        
+    def info(self):
+        """Kernel information.
+        
+        Returns:
+        - Return kernel information.
+        """
+        
+        return "Compiled R3Term relations stored as connection-aligned weight & history arrays"
+        
+    def propagate(self, state):
+        """Propagate state through compiled relations, update history and calculate new values of following concepts.
+        
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        Returns:
+        - numpy array containing new activation values of following concepts
+        """
+        
+        pvalues, dvalues, avalues = self.history
+        # P = proportional component as current activation value
+        current = state[..., self.indices]
+        # D = differential component as difference betwen current and last activation value
+        dvalues = current - pvalues
+        pvalues = current
+        # A = averaging component as moving average of historical values
+        avalues = (avalues * self.awindow + pvalues) / (1 + self.awindow)
+        self.history = (pvalues, dvalues, avalues)
+        # sum += w_p*P + w_d*D + w_a*A
+        products = self.pweights * pvalues + self.dweights * dvalues + self.aweights * avalues
+        sums = np.add.reduceat(products, self.indptr[:-1], axis=-1)
+        with np.errstate(over='ignore'):
+            return 1 / (1 + np.exp(-sums))
+        
+    def reset(self, state):
+        """Initialize history for provided (batch of) states as if concepts were just attached.
+        
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        """
+        
+        current = state[..., self.indices]
+        self.history = (current.copy(), np.zeros_like(current), current.copy())
+        
+    def push(self, fcm):
+        """Write history back to compiled R3Term relations.
+        
+        Arguments:
+        - fcm - compiled FCM object
+        """
+        
+        pvalues, dvalues, avalues = [v.tolist() for v in self.history]
+        for row, name in enumerate(self.names):
+            start, end = self.indptr[row], self.indptr[row + 1]
+            relation = fcm[name].relation
+            relation.pvalues = pvalues[start:end]
+            relation.dvalues = dvalues[start:end]
+            relation.avalues = avalues[start:end]
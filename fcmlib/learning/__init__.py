@@ -0,0 +1,5 @@
+from .gradient import GradientDescent
+from .evolution import DifferentialEvolution
+from .hebbian import HebbianLearning
+
+del gradient, evolution, hebbian
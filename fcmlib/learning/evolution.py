@@ -0,0 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+#worker process state (set by _initialize)
+_problem_ = None
+
+def _initialize(kernels, states, steps, target, fitness):
+    """Store evaluated problem in worker process."""
+    global _problem_
+    _problem_ = (kernels, states, steps, target, fitness)
+
+def _evaluate(genomes):
+    """Evaluate fitness of part of population in worker process."""
+    kernels, states, steps, target, fitness = _problem_
+    return fitness(simulate(kernels, genomes, states, steps), target)
+
+def mse(trajectory, target):
+    """Default fitness - mean squared error between simulated and desired trajectory.
+
+    Arguments:
+    - trajectory - simulated trajectories (steps x population x scenarios x concepts)
+    - target     - desired trajectory (steps x scenarios x concepts)
+    Returns:
+    - numpy array of errors of candidates (population)
+    """
+
+    if target is None:
+        raise Exception("Error - target trajectory is required by default fitness")
+    return np.mean((trajectory - target[:, np.newaxis]) ** 2, axis=(0, 2, 3))
+
+def simulate(kernels, genomes, states, steps):
+    """Simulate scenarios for whole population of candidate weights at once.
+
+    Kernels providing weights of connections (compiled RSimpleSigmoid relations) use weights of each candidate
+    (genome is concatenation of weights of all such kernels), other kernels are shared by all candidates.
+
+    Arguments:
+    - kernels - list of compiled kernels
+    - genomes - array of candidate weights (population x trainable connections)
+    - states  - array of initial states (scenarios x concepts)
+    - steps   - number of simulation steps
+    Returns:
+    - numpy array of trajectories (steps x population x scenarios x concepts)
+    """
+
+    state = np.repeat(np.asarray(states)[np.newaxis], len(genomes), axis=0)
+    result = np.empty((steps,) + state.shape, dtype=state.dtype)
+    #slices of genome belonging to trainable kernels
+    slices = {}
+    start = 0
+    for kernel in kernels:
+        if kernel.trainable:
+            slices[id(kernel)] = slice(start, start + len(kernel.indices))
+            start += len(kernel.indices)
+    #stateful kernels start with fresh history for simulated states
+    history = [kernel.history for kernel in kernels]
+    for kernel in kernels:
+        kernel.reset(state)
+    try:
+        for step in range(steps):
+            new = state.copy()
+            for kernel in kernels:
+                if id(kernel) in slices:
+                    new[..., kernel.targets] = kernel.propagate(state, genomes[:, np.newaxis, slices[id(kernel)]])
+                else:
+                    new[..., kernel.targets] = kernel.propagate(state)
+            state = result[step] = new
+    finally:
+        for kernel, kernelHistory in zip(kernels, history):
+            kernel.history = kernelHistory
+    return result
+
+class DifferentialEvolution:
+    """Population-based learning of compiled FCM weights via differential evolution (DE/rand/1/bin).
+       Candidates are vectors of weights of all compiled RSimpleSigmoid connections (absent connections stay zero).
+       Whole population of each generation is simulated as single batched tensor simulation,
+       optionally split among pool of worker processes.
+
+    Attributes:
+    - population  - number of candidates in population (at least 4)
+    - generations - maximal number of generations
+    - mutation    - differential weight (F)
+    - crossover   - crossover probability (CR)
+    - bounds      - tuple (lower, upper) of allowed weight values
+    - tol         - stop when fitness of the best candidate is not greater than tol
+    - workers     - number of worker processes evaluating population (None or 1 evaluates in current process)
+    - seed        - seed of random number generator
+    """
+
+    population = None
+    generations = None
+    mutation = None
+    crossover = None
+    bounds = None
+    tol = None
+    workers = None
+    seed = None
+
+    def __init__(self, population=50, generations=100, mutation=0.5, crossover=0.9, bounds=(-1, 1), tol=0, workers=None, seed=None):
+        """Learning instantiation operation (constructor).
+
+        Arguments:
+        - population  - number of candidates in population (optional)
+        - generations - maximal number of generations (optional)
+        - mutation    - differential weight (optional)
+        - crossover   - crossover probability (optional)
+        - bounds      - tuple (lower, upper) of allowed weight values (optional)
+        - tol         - fitness considered sufficient (optional)
+        - workers     - number of worker processes (optional)
+        - seed        - seed of random number generator (optional)
+        Returns:
+        - new DifferentialEvolution object or raises Error exception.
+        """
+
+        if population < 4:
+            raise Exception("Error - population must contain at least 4 candidates")
+        self.population = population
+        self.generations = generations
+        self.mutation = mutation
+        self.crossover = crossover
+        self.bounds = bounds
+        self.tol = tol
+        self.workers = workers
+        self.seed = seed
+
+    def __repr__(self):
+        """Return repr(self)."""
+
+        return '%s(%s)' % (type(self).__name__, str(dict(population=self.population, generations=self.generations, mutation=self.mutation, crossover=self.crossover)))
+
+    def fit(self, engine, states, steps, target=None, fitness=None):
+        """Train weights of compiled engine, the best found weights are assigned to kernels.
+
+        Arguments:
+        - engine  - compiled Engine object
+        - states  - array of initial states (scenarios x concepts)
+        - steps   - number of simulation steps
+        - target  - desired trajectory (steps x scenarios x concepts) used by fitness (optional)
+        - fitness - function(trajectory, target) returning array of errors of candidates (minimized),
+                    trajectory has shape (steps x population x scenarios x concepts),
+                    must be module-level function when workers are used (optional, default mse)
+        Returns:
+        - numpy array containing fitness of the best candidate in each generation
+        """
+
+        states = np.asarray(states, dtype=engine.dtype)
+        if states.ndim != 2 or states.shape[1] != len(engine.names):
+            raise Exception("Error - states must be array of shape (scenarios, " + str(len(engine.names)) + ")")
+        if target is not None:
+            target = np.asarray(target, dtype=engine.dtype)
+            if target.shape != (steps,) + states.shape:
+                raise Exception("Error - target must be array of shape " + str((steps,) + states.shape))
+        if fitness is None:
+            fitness = mse
+        kernels = [kernel for kernel in engine.kernels if kernel.trainable]
+        if len(kernels) == 0:
+            raise Exception("Error - compiled map contains no trainable relations")
+        rng = np.random.default_rng(self.seed)
+        low, high = self.bounds
+        #initial population (current weights are kept as one of candidates)
+        population = rng.uniform(low, high, (self.population, sum([len(kernel.indices) for kernel in kernels]))).astype(engine.dtype)
+        population[0] = np.clip(np.concatenate([kernel.edges() for kernel in kernels]), low, high)
+        executor = None
+        if self.workers is not None and self.workers > 1:
+            executor = ProcessPoolExecutor(self.workers, initializer=_initialize, initargs=(engine.kernels, states, steps, target, fitness))
+        try:
+            def evaluate(genomes):
+                if executor is None:
+                    return fitness(simulate(engine.kernels, genomes, states, steps), target)
+                return np.concatenate(list(executor.map(_evaluate, np.array_split(genomes, self.workers))))
+            scores = evaluate(population)
+            best = []
+            candidates = np.arange(self.population)
+            for generation in range(self.generations):
+                #mutation - three distinct candidates other than the target one
+                choice = np.array([rng.choice(np.delete(candidates, i), 3, replace=False) for i in candidates])
+                mutants = population[choice[:, 0]] + self.mutation * (population[choice[:, 1]] - population[choice[:, 2]])
+                np.clip(mutants, low, high, out=mutants)
+                #binomial crossover (at least one weight is taken from mutant)
+                cross = rng.random(population.shape) < self.crossover
+                cross[candidates, rng.integers(population.shape[1], size=self.population)] = True
+                trials = np.where(cross, mutants, population)
+                #selection
+                trialScores = evaluate(trials)
+                better = trialScores <= scores
+                population[better] = trials[better]
+                scores[better] = trialScores[better]
+                best.append(scores.min())
+                if best[-1] <= self.tol:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        #assign the best candidate to kernels
+        genome = population[np.argmin(scores)]
+        start = 0
+        for kernel in kernels:
+            kernel.assign(genome[start:start + len(kernel.indices)])
+            start += len(kernel.indices)
+        return np.array(best)
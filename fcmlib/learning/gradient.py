@@ -0,0 +1,79 @@
+import numpy as np
+
+class GradientDescent:
+    """Mini-batch gradient descent learning of compiled FCM weights from pairs of consecutive states.
+       Gradients of all connections are calculated at once for each mini-batch (mean squared error loss).
+       Only kernels providing gradient (compiled RSimpleSigmoid relations) are trained, absent connections stay zero.
+    
+    Attributes:
+    - lr        - learning rate
+    - epochs    - number of passes over training data
+    - batchSize - number of state pairs in single mini-batch
+    - shuffle   - shuffle state pairs before each epoch
+    """
+    
+    lr = None
+    epochs = None
+    batchSize = None
+    shuffle = None
+    
+    def __init__(self, lr=0.1, epochs=10, batchSize=32, shuffle=True):
+        """Learning instantiation operation (constructor).
+        
+        Arguments:
+        - lr        - learning rate (optional)
+        - epochs    - number of passes over training data (optional)
+        - batchSize - number of state pairs in single mini-batch (optional)
+        - shuffle   - shuffle state pairs before each epoch (optional)
+        Returns:
+        - new GradientDescent object.
+        """
+        
+        self.lr = lr
+        self.epochs = epochs
+        self.batchSize = batchSize
+        self.shuffle = shuffle
+        
+    def __repr__(self):
+        """Return repr(self)."""
+        
+        return '%s(%s)' % (type(self).__name__, str(dict(lr=self.lr, epochs=self.epochs, batchSize=self.batchSize)))
+    
+    def fit(self, engine, X, Y):
+        """Train weights of compiled engine.
+        
+        Arguments:
+        - engine - compiled Engine object
+        - X      - 2-D array of states in time "t" (samples x concepts)
+        - Y      - 2-D array of states in time "t+1" (samples x concepts)
+        Returns:
+        - numpy array containing mean squared error of each epoch
+        """
+        
+        X = np.asarray(X, dtype=engine.dtype)
+        Y = np.asarray(Y, dtype=engine.dtype)
+        if X.ndim != 2 or Y.ndim != 2 or X.shape[1] != len(engine.names) or Y.shape[1] != len(engine.names):
+            raise Exception("Error - X and Y must be arrays of shape (samples, " + str(len(engine.names)) + ")")
+        if len(X) != len(Y):
+            raise Exception("Error - X and Y must contain the same number of samples (" + str(len(X)) + " != " + str(len(Y)) + ")")
+        if len(X) == 0:
+            raise Exception("Error - X and Y must contain at least one sample")
+        kernels = [kernel for kernel in engine.kernels if kernel.trainable]
+        if len(kernels) == 0:
+            raise Exception("Error - compiled map contains no trainable relations")
+        count = sum([len(kernel.targets) for kernel in kernels])
+        losses = np.zeros(self.epochs)
+        for epoch in range(self.epochs):
+            order = np.random.permutation(len(X)) if self.shuffle else np.arange(len(X))
+            for start in range(0, len(X), self.batchSize):
+                batch = order[start:start + self.batchSize]
+                state = X[batch]
+                for kernel in kernels:
+                    #forward pass & error signal (derivative of squared error through sigmoid)
+                    output = kernel.propagate(state)
+                    error = output - Y[batch][:, kernel.targets]
+                    delta = error * output * (1 - output)
+                    kernel.weights -= self.lr * kernel.gradient(state, delta) / len(batch)
+                    losses[epoch] += np.sum(error ** 2)
+            losses[epoch] /= len(X) * count
+        return losses
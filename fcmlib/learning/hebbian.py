@@ -0,0 +1,102 @@
+import numpy as np
+
+class HebbianLearning:
+    """Unsupervised Hebbian learning of compiled FCM weights (NHL - nonlinear Hebbian learning, AHL - active Hebbian learning).
+       Weights of all compiled RSimpleSigmoid connections are updated at once in each iteration by outer product of
+       activation values of preceding and following concepts restricted to existing connections (absent connections stay zero):
+       - NHL: w = (1 - decay) * w + lr * A_pre * (A_fol - sign(w) * w * A_pre), sign of initial weights is preserved
+       - AHL: w = (1 - decay) * w + lr * A_pre * (A_fol - w * A_pre)
+       Weights are kept within [-1, 1].
+
+    Attributes:
+    - rule   - learning rule "nhl" or "ahl"
+    - lr     - learning rate
+    - decay  - weight decay
+    - epochs - maximal number of iterations
+    - tol    - stop when activation values of output concepts change by at most tol
+    """
+
+    rule = None
+    lr = None
+    decay = None
+    epochs = None
+    tol = None
+
+    def __init__(self, rule="nhl", lr=0.01, decay=0.02, epochs=1000, tol=0.002):
+        """Learning instantiation operation (constructor).
+
+        Arguments:
+        - rule   - learning rule "nhl" or "ahl" (optional)
+        - lr     - learning rate (optional)
+        - decay  - weight decay (optional)
+        - epochs - maximal number of iterations (optional)
+        - tol    - maximal change of output concepts considered stable (optional)
+        Returns:
+        - new HebbianLearning object or raises Error exception.
+        """
+
+        if rule not in ("nhl", "ahl"):
+            raise Exception("Error - unknown learning rule " + str(rule))
+        self.rule = rule
+        self.lr = lr
+        self.decay = decay
+        self.epochs = epochs
+        self.tol = tol
+
+    def __repr__(self):
+        """Return repr(self)."""
+
+        return '%s(%s)' % (type(self).__name__, str(dict(rule=self.rule, lr=self.lr, decay=self.decay, epochs=self.epochs)))
+
+    def fit(self, engine, outputs=None, target=None):
+        """Train weights of compiled engine starting from its current state (engine state is updated).
+        Learning stops when activation values of output concepts are stable (change at most tol)
+        and, if target is given, when distance of output concepts from target stops decreasing.
+
+        Arguments:
+        - engine  - compiled Engine object
+        - outputs - state vector indices of output concepts (optional, default all concepts)
+        - target  - desired activation values of output concepts (optional)
+        Returns:
+        - numpy array containing maximal change of output concepts in each iteration,
+          or distance of output concepts from target (square root of sum of squared errors) if target is given
+        """
+
+        kernels = [kernel for kernel in engine.kernels if kernel.trainable]
+        if len(kernels) == 0:
+            raise Exception("Error - compiled map contains no trainable relations")
+        outputs = np.arange(len(engine.names)) if outputs is None else np.asarray(outputs, dtype=np.intp)
+        if target is not None:
+            target = np.asarray(target, dtype=float)
+            if target.shape != outputs.shape:
+                raise Exception("Error - target must contain " + str(len(outputs)) + " values")
+        #following concept of each connection
+        rows = [kernel.connections()[0] for kernel in kernels]
+        signs = [np.sign(kernel.edges()) for kernel in kernels]
+        errors = []
+        state = engine.state
+        for epoch in range(self.epochs):
+            #update weights of all connections from current activation values
+            for kernel, following, sign in zip(kernels, rows, signs):
+                weights = kernel.edges()
+                preceding = state[kernel.indices]
+                if self.rule == "nhl":
+                    weights = (1 - self.decay) * weights + self.lr * preceding * (state[following] - sign * weights * preceding)
+                    weights[sign * weights < 0] = 0
+                else:
+                    weights = (1 - self.decay) * weights + self.lr * preceding * (state[following] - weights * preceding)
+                kernel.assign(np.clip(weights, -1, 1))
+            #update activation values
+            new = engine.propagate(state)
+            change = np.max(np.abs(new[outputs] - state[outputs]), initial=0)
+            state = new
+            if target is None:
+                errors.append(change)
+                if change <= self.tol:
+                    break
+            else:
+                errors.append(np.sqrt(np.sum((state[outputs] - target) ** 2)))
+                if change <= self.tol and (len(errors) < 2 or errors[-1] >= errors[-2]):
+                    break
+        engine.state = state
+        return np.array(errors)
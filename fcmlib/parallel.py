@@ -0,0 +1,168 @@
+from fcmlib.engine import Engine
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from collections import deque
+import numpy as np
+import weakref
+
+#worker process state (set by _initialize)
+_kernels_ = None
+_memory_ = None
+_buffers_ = None
+
+def _initialize(names, size, dtype, kernels):
+    """Attach worker process to shared state buffers and store kernels of its block."""
+    global _kernels_, _memory_, _buffers_
+    _kernels_ = kernels
+    _memory_ = [shared_memory.SharedMemory(name=name) for name in names]
+    _buffers_ = [np.ndarray((size,), dtype=dtype, buffer=m.buf) for m in _memory_]
+
+def _evaluate():
+    """Calculate new values of concepts of worker block from old state (buffer 0) into new state (buffer 1)."""
+    old, new = _buffers_
+    for kernel in _kernels_:
+        new[kernel.targets] = kernel.propagate(old)
+
+def _release(executors, memory):
+    """Shut down worker processes and release shared memory (called once by close() or when engine is garbage collected)."""
+    for executor in executors:
+        executor.shutdown()
+    for m in memory:
+        m.close()
+        m.unlink()
+
+def partition(kernels, size, count):
+    """Split following concepts into blocks of similar size sharing few connections.
+    
+    Concepts are ordered by breadth-first traversal of (undirected) map graph, so connected concepts
+    are placed next to each other, and the order is then cut into blocks.
+    
+    Arguments:
+    - kernels - list of compiled kernels
+    - size    - number of concepts of the map
+    - count   - number of blocks
+    Returns:
+    - list of arrays of state vector indices of following concepts
+    """
+    
+    #undirected adjacency lists
+    neighbours = [[] for i in range(size)]
+    targets = np.zeros(size, dtype=bool)
+    for kernel in kernels:
+        targets[kernel.targets] = True
+        for following, preceding in zip(*[a.tolist() for a in kernel.connections()]):
+            neighbours[following].append(preceding)
+            neighbours[preceding].append(following)
+    #breadth-first ordering of following concepts
+    order = []
+    visited = np.zeros(size, dtype=bool)
+    for seed in range(size):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        queue = deque([seed])
+        while queue:
+            current = queue.popleft()
+            if targets[current]:
+                order.append(current)
+            for neighbour in neighbours[current]:
+                if not visited[neighbour]:
+                    visited[neighbour] = True
+                    queue.append(neighbour)
+    return [block for block in np.array_split(np.array(order, dtype=np.intp), count) if len(block) > 0]
+
+class ParallelEngine(Engine):
+    """Compiled form of FCM evaluated in parallel by pool of worker processes.
+       Map is partitioned into blocks of following concepts, each block is evaluated by worker process
+       from old state in shared memory into new state in shared memory, so all new values are calculated
+       from the old state before being committed (as in FCM.update()).
+       Each block is evaluated by its own worker process, which holds only kernels of that block.
+       Worker processes and shared memory are released by close() or when the engine is garbage collected.
+    
+    Attributes:
+    - workers   - number of worker processes
+    - blocks    - list of arrays of state vector indices of following concepts evaluated by single worker
+    - memory    - shared memory blocks holding old & new state
+    - buffers   - numpy arrays viewing shared memory (old & new state)
+    - executors - single-process pools (one per block)
+    - finalizer - weakref.finalize object releasing worker processes & shared memory
+    """
+    
+    workers = None
+    blocks = None
+    memory = None
+    buffers = None
+    executors = None
+    finalizer = None
+    
+    def __init__(self, fcm, backend=None, workers=2):
+        """Engine instantiation operation (constructor).
+        
+        Arguments:
+        - fcm     - FCM object to be compiled
+        - backend - "dense", "sparse" or "auto" storage of weights (optional)
+        - workers - number of worker processes (optional)
+        Returns:
+        - new ParallelEngine object or raises Error Exception.
+        """
+        
+        Engine.__init__(self, fcm, backend)
+        for kernel in self.kernels:
+            if not kernel.selectable:
+                raise Exception("Error - kernel " + type(kernel).__name__ + " cannot be evaluated in parallel")
+        self.workers = workers
+        self.blocks = partition(self.kernels, len(self.names), workers)
+        #kernels restricted to following concepts of each block
+        kernelBlocks = []
+        for block in self.blocks:
+            kernelBlock = []
+            for kernel in self.kernels:
+                rows = np.nonzero(np.isin(kernel.targets, block))[0]
+                if len(rows) > 0:
+                    kernelBlock.append(kernel.select(rows))
+            kernelBlocks.append(kernelBlock)
+        #shared old & new state
+        size = max(len(self.names), 1)
+        self.memory = [shared_memory.SharedMemory(create=True, size=size * self.dtype.itemsize) for i in range(2)]
+        self.executors = []
+        self.finalizer = weakref.finalize(self, _release, self.executors, self.memory)
+        self.buffers = [np.ndarray((size,), dtype=self.dtype, buffer=m.buf) for m in self.memory]
+        for kernelBlock in kernelBlocks:
+            self.executors.append(ProcessPoolExecutor(1, initializer=_initialize, initargs=([m.name for m in self.memory], size, self.dtype, kernelBlock)))
+    
+    def __repr__(self):
+        """Return repr(self)."""
+        
+        return '%s(%s)' % (type(self).__name__, str(dict(workers=self.workers, blocks=len(self.blocks), kernels=self.kernels)))
+    
+    def propagate(self, state, out=None):
+        """Calculate new activation values of all concepts from provided state (batches of states are calculated serially).
+        
+        Arguments:
+        - state - numpy array containing activation values of all concepts
+        - out   - preallocated numpy array (other than state) used to store the result (optional)
+        Returns:
+        - numpy array containing new activation values of all concepts
+        """
+        
+        if state.ndim != 1 or len(state) == 0:
+            return Engine.propagate(self, state, out)
+        old, new = self.buffers
+        old[:] = state
+        new[:] = state
+        for future in [executor.submit(_evaluate) for executor in self.executors]:
+            future.result()
+        if out is None:
+            return new.copy()
+        out[...] = new
+        return out
+    
+    def close(self):
+        """Shut down worker processes and release shared memory (can be called repeatedly)."""
+        
+        #views of shared memory must be released before it is closed
+        self.buffers = None
+        if self.finalizer is not None:
+            self.finalizer()
+        self.executors = None
+        self.memory = None
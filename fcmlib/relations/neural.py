@@ -8,13 +8,17 @@ class RNeural(IRelation):
     Attributes:
     - previous  - list of connected preceding concepts
     - weights   - list of weights - [[layer_1],...,[output_layer]]
+    - index     - dictionary mapping names of preceding concepts to their input positions
+    - buffers   - preallocated mini-batch buffers (activations, deltas, gradients) (not serialized)
     """
     
     previous = None
     weights = None
+    index = None
     activations = None
     errors = None
     deltas = None
+    buffers = None
     
 
     def __init__(self,*size):
@@ -28,11 +32,25 @@ class RNeural(IRelation):
         else: size=list(size)
         
         self.previous = []
+        self.index = {}
         self.weights = [np.random.random((neurons, inputs_per_neuron))*2-1 for inputs_per_neuron, neurons in zip([0]+size,size+[1])]
         self.activations = [np.array([0 for neuron in range(layer)]) for layer in [0]+size+[1]]
         self.errors = [np.array([0 for neuron in range(layer)]) for layer in [0]+size+[1]]
         self.deltas = [np.array([0 for neuron in range(layer)]) for layer in [0]+size+[1]]
         
+    def __getstate__(self):
+        """Return state of relation for serialization (without mini-batch buffers)."""
+        
+        state = dict(self.__dict__)
+        state.pop("buffers", None)
+        return state
+        
+    def __setstate__(self, state):
+        """Restore state of relation after deserialization (mini-batch buffers are allocated again on first use)."""
+        
+        self.__dict__.update(state)
+        self.buffers = None
+        
     def __repr__(self):
         """Return repr(self)."""
         
@@ -74,9 +92,10 @@ class RNeural(IRelation):
         - None or raises Error exception
         """
         
-        if any(x.name == concept.name for x in self.previous):
+        if concept.name in self.index:
             raise Exception("Error - concept with name is already connected to the relation")
         else:
+            self.index[concept.name] = len(self.previous)
             self.previous.append(concept)
             self.weights[0] = np.hstack((self.weights[0],np.random.random((self.weights[0].shape[0],1))*2-1))
 
@@ -89,12 +108,13 @@ class RNeural(IRelation):
         - None or raises Error exception
         """
         
-        if any(x.name == concept.name for x in self.previous):
-            for i in range(len(self.previous)):
-                if self.previous[i].name == concept.name:
-                    self.previous.pop(i)
-                    self.weights[0] = np.delete(self.weights[0],i,axis=1)
-                    break
+        if concept.name in self.index:
+            #remove input keeping order of remaining ones (positional weights of get()/set())
+            i = self.index.pop(concept.name)
+            self.previous.pop(i)
+            self.weights[0] = np.delete(self.weights[0], i, axis=1)
+            for j in range(i, len(self.previous)):
+                self.index[self.previous[j].name] = j
         else:
             raise Exception("Error - concept with name was not found in the relation")
 
@@ -116,13 +136,9 @@ class RNeural(IRelation):
                         toReturn.append(str(weight))
             return ",".join(toReturn)
         #return weights of only specified concept
-        s = -1
-        for i in range(len(self.previous)):
-            if self.previous[i].name == selection:
-                s=i
-                break
-        if s == -1:
+        if selection not in self.index:
             raise Exception("Error - no such concept: "+str(selection))
+        s = self.index[selection]
         for neuron in self.weights[0]:
             toReturn.append(str(neuron[s]))
         return ",".join(toReturn)
@@ -139,14 +155,12 @@ class RNeural(IRelation):
     
         #set specific single concept weights
         if selection and value:
-            if not any(x.name == selection for x in self.previous):
+            if selection not in self.index:
                 raise Exception("Error - concept with name "+str(selection)+" was not found in the relation")
-            for i in range(len(self.previous)):
-                if self.previous[i].name == selection:
-                    values=value.split(',')
-                    for neuron in range(len(self.weights[0])):
-                        self.weights[0][neuron][i]=float(values[neuron])
-                    break
+            i = self.index[selection]
+            values=value.split(',')
+            for neuron in range(len(self.weights[0])):
+                self.weights[0][neuron][i]=float(values[neuron])
         #set all weights
         elif selection and not value:
             values = selection.split(",");
@@ -172,7 +186,7 @@ class RNeural(IRelation):
         for layer in range(len(self.weights)):
             self.activations.append(self.__sigmoid(np.dot(self.activations[-1], self.weights[layer].T)))
         #return activation of the output neuron
-        return float(self.activations[-1][0])
+        return float(self.activations[-1][0][0])
         
     def backprop(self, error):
         """Error backpropagation.
@@ -218,3 +232,69 @@ class RNeural(IRelation):
             #print(self.deltas[layer+1],"___deltas")
             #print((gama * np.dot(self.activations[layer].T, self.deltas[layer+1])).T,"___adjustment")
 
+    def __batchBuffers(self, batch):
+        """Return preallocated mini-batch buffers (activations, deltas, gradients) for given batch size."""
+
+        buffers = self.buffers
+        shapes = [w.shape for w in self.weights]
+        if buffers is None or buffers[0][0].shape[0] != batch or [g.shape for g in buffers[2]] != shapes:
+            activations = [np.empty((batch, len(self.previous)))] + [np.empty((batch, shape[0])) for shape in shapes]
+            deltas = [np.empty((batch, shape[0])) for shape in shapes]
+            gradients = [np.empty(shape) for shape in shapes]
+            buffers = self.buffers = (activations, deltas, gradients)
+        return buffers
+
+    def propagate_batch(self, X):
+        """Calculate output of relation for multiple input samples at once.
+
+        Arguments:
+        - X - array of input samples (batch x preceding concepts), columns ordered as previous concepts
+        Returns:
+        - numpy array of relation outputs (batch) or raises Error exception
+        """
+
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != len(self.previous):
+            raise Exception("Error - X must have shape (batch, " + str(len(self.previous)) + ")")
+        activations = self.__batchBuffers(X.shape[0])[0]
+        activations[0][...] = X
+        #calculate activations through each layer of the network in place
+        for layer in range(len(self.weights)):
+            out = activations[layer+1]
+            np.dot(activations[layer], self.weights[layer].T, out=out)
+            np.negative(out, out=out)
+            with np.errstate(over='ignore'):
+                np.exp(out, out=out)
+            out += 1
+            np.reciprocal(out, out=out)
+        return activations[-1][:, 0].copy()
+
+    def fit_batch(self, X, y, lr):
+        """Relation adaptation/learning via the "delta rule" over mini-batch of samples.
+        Weights are adjusted by gradient averaged over the batch.
+
+        Arguments:
+        - X  - array of input samples (batch x preceding concepts), columns ordered as previous concepts
+        - y  - array of desired relation outputs (batch)
+        - lr - learning rate
+        Returns:
+        - mean squared error of relation outputs before adaptation or raises Error exception
+        """
+
+        y = np.asarray(y, dtype=float).reshape(-1)
+        output = self.propagate_batch(X)
+        if y.shape[0] != output.shape[0]:
+            raise Exception("Error - y must have " + str(output.shape[0]) + " values")
+        activations, deltas, gradients = self.__batchBuffers(output.shape[0])
+        #set deltas of the output neuron
+        deltas[-1][:, 0] = (y - output) * self.__sigmoid_derivative(output)
+        #calculate deltas through each hidden layer of the network
+        for layer in range(len(self.weights)-2,-1,-1):
+            np.dot(deltas[layer+1], self.weights[layer+1], out=deltas[layer])
+            deltas[layer] *= activations[layer+1]
+            deltas[layer] *= 1 - activations[layer+1]
+        #adjust weights through the network
+        for layer in range(len(self.weights)):
+            np.dot(deltas[layer].T, activations[layer], out=gradients[layer])
+            self.weights[layer] += (lr / output.shape[0]) * gradients[layer]
+        return float(np.mean((y - output) ** 2))
@@ -8,10 +8,12 @@ class RSimpleSigmoid(IRelation):
     Attributes:
     - previous  - list of connected preceding concepts
     - weights   - list of linear weights    
+    - index     - dictionary mapping names of preceding concepts to their positions in lists
     """
     
     previous = None
     weights = None
+    index = None
 
     def __init__(self):
         """Function instantiation operation (constructor).
@@ -22,6 +24,7 @@ class RSimpleSigmoid(IRelation):
         
         self.previous = []
         self.weights = []
+        self.index = {}
         
     def __repr__(self):
         """Return repr(self)."""
@@ -54,9 +57,10 @@ class RSimpleSigmoid(IRelation):
         - None or raises Error exception
         """
         
-        if any(x.name == concept.name for x in self.previous):
+        if concept.name in self.index:
             raise Exception("Error - concept with name is already connected to the relation")
         else:
+            self.index[concept.name] = len(self.previous)
             self.previous.append(concept)
             self.weights.append(1)
 
@@ -69,12 +73,13 @@ class RSimpleSigmoid(IRelation):
         - None or raises Error exception
         """
         
-        if any(x.name == concept.name for x in self.previous):
-            for i in range(len(self.previous)):
-                if self.previous[i].name == concept.name:
-                    self.previous.pop(i)
-                    self.weights.pop(i)
-                    break
+        if concept.name in self.index:
+            #remove concept keeping order of remaining ones (positional weights of get()/set())
+            i = self.index.pop(concept.name)
+            self.previous.pop(i)
+            self.weights.pop(i)
+            for j in range(i, len(self.previous)):
+                self.index[self.previous[j].name] = j
         else:
             raise Exception("Error - concept with name was not found in the relation")
 
@@ -94,10 +99,9 @@ class RSimpleSigmoid(IRelation):
         if not selection:
             return ";".join([str(s) for s in self.weights])
         #return weight of only specified concept
-        weight = [self.weights[self.previous.index(c)] for c in self.previous if c.name==selection]
-        if weight == []:
+        if selection not in self.index:
             raise Exception("Error - concept with name "+str(selection)+" was not found in the relation")
-        return str(weight[0])
+        return str(self.weights[self.index[selection]])
 
     def set(self, selection, value=None):
         """Set relation using provided data.
@@ -112,11 +116,9 @@ class RSimpleSigmoid(IRelation):
         #set specific single weight
         if selection and value:
             #print("S:",selection,"val",value)
-            if not any(x.name == selection for x in self.previous):
+            if selection not in self.index:
                 raise Exception("Error - concept with name "+str(selection)+" was not found in the relation")
-            for i in range(len(self.previous)):
-                if self.previous[i].name == selection:
-                    self.weights[i] = float(value)
+            self.weights[self.index[selection]] = float(value)
         #set all weights
         elif selection and not value:
             delimiterChars = [' ',':',';','\t']
@@ -160,7 +162,7 @@ class RSimpleSigmoid(IRelation):
         """
         
         for i in range(len(self.previous)):
-            delta = error * self.__sigmoid_derivative(previous[i].value)
-            self.weights[i] += gama * delta * previous[i].value
+            delta = error * self.__sigmoid_derivative(self.previous[i].value)
+            self.weights[i] += gama * delta * self.previous[i].value
 
 
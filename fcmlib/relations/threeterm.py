@@ -15,6 +15,7 @@ class R3Term(IRelation):
     - dvalues   - list of difference of activation values of preceding concepts
     - avalues   - list of moving-average values of preceding concepts
     - awindow   - time window used to calculate moving average
+    - index     - dictionary mapping names of preceding concepts to their positions in lists
     """
     
     previous = None
@@ -26,6 +27,7 @@ class R3Term(IRelation):
     dvalues = None
     avalues = None
     awindow = None
+    index = None
 
     def __init__(self,window=10):
         """Function instantiation operation (constructor).
@@ -43,6 +45,7 @@ class R3Term(IRelation):
         self.dvalues  = []
         self.avalues  = []
         self.awindow = window
+        self.index = {}
         
     def __repr__(self):
         """Return repr(self)."""
@@ -76,9 +79,10 @@ class R3Term(IRelation):
         - None or raises Error exception
         """
         
-        if any(x.name == concept.name for x in self.previous):
+        if concept.name in self.index:
             raise Exception("Error - concept with name is already connected to the relation")
         else:
+            self.index[concept.name] = len(self.previous)
             self.previous.append(concept)
             self.weights.append([1.0,1.0,1.0])
             self.pweights.append(1.0)
@@ -97,18 +101,14 @@ class R3Term(IRelation):
         - None or raises Error exception
         """
         
-        if any(x.name == concept.name for x in self.previous):
-            for i in range(len(self.previous)):
-                if self.previous[i].name == concept.name:
-                    self.previous.pop(i)
-                    self.weights.pop(i)
-                    self.pweights.pop(i)
-                    self.dweights.pop(i)
-                    self.aweights.pop(i)
-                    self.pvalues.pop(i)
-                    self.dvalues.pop(i)
-                    self.avalues.pop(i)
-                    break
+        if concept.name in self.index:
+            #remove concept keeping order of remaining ones (positional weights of get()/set())
+            i = self.index.pop(concept.name)
+            self.previous.pop(i)
+            for values in (self.weights, self.pweights, self.dweights, self.aweights, self.pvalues, self.dvalues, self.avalues):
+                values.pop(i)
+            for j in range(i, len(self.previous)):
+                self.index[self.previous[j].name] = j
         else:
             raise Exception("Error - concept with name was not found in the relation")
 
@@ -128,13 +128,9 @@ class R3Term(IRelation):
         if not selection:
             return ";".join([str(w[0])+","+str(w[1])+","+str(w[2]) for w in self.weights])
         #return weights of only specified concept
-        s = -1
-        for i in range(len(self.previous)):
-            if self.previous[i].name == selection:
-                s=i
-                break
-        if s == -1:
+        if selection not in self.index:
             raise Exception("Error - no such concept: "+str(selection))
+        s = self.index[selection]
         return str(self.pweights[s])+','+str(self.dweights[s])+','+str(self.aweights[s])
 
     def set(self, selection, value=None):
@@ -149,22 +145,20 @@ class R3Term(IRelation):
     
         #set specific single concept weights
         if selection and value:
-            if not any(x.name == selection for x in self.previous):
+            if selection not in self.index:
                 raise Exception("Error - concept with name "+str(selection)+" was not found in the relation")
-            for i in range(len(self.previous)):
-                if self.previous[i].name == selection:
-                    values=value.split(',')
-                    self.pweights[i] = float(values[0])
-                    self.dweights[i] = float(values[1])
-                    self.aweights[i] = float(values[2])
-                    self.weights[i] = [float(values[0]),float(values[1]),float(values[2])]
-                    break
+            i = self.index[selection]
+            values=value.split(',')
+            self.pweights[i] = float(values[0])
+            self.dweights[i] = float(values[1])
+            self.aweights[i] = float(values[2])
+            self.weights[i] = [float(values[0]),float(values[1]),float(values[2])]
         #set all weights
         elif selection and not value:
             tterms = selection.split(";");
             if len(tterms) != len(self.pweights):
                 raise Exception("Error - wrong number of values to be assigned as weights")
-            self.weights = [list(map(float(tt.split(",")))) for tt in tterms]
+            self.weights = [list(map(float,tt.split(","))) for tt in tterms]
             self.pweights = [tt[0] for tt in self.weights]
             self.dweights = [tt[1] for tt in self.weights]
             self.aweights = [tt[2] for tt in self.weights]
@@ -0,0 +1,138 @@
+import json, os
+import numpy as np
+
+class Trajectory:
+    """Trajectory of FCM simulation stored in binary file on disk (records x concepts).
+       Records are appended to raw binary file by blocks, names of concepts and data type are stored
+       alongside in JSON metadata file ("<path>.json"). File is read via numpy.memmap, so time windows
+       and subsets of concepts can be read without loading the whole trajectory into memory.
+
+    Attributes:
+    - path   - path of binary data file
+    - names  - list of concept names (columns of records)
+    - dtype  - numpy data type of records
+    - block  - number of records buffered in memory before being written to file
+    - buffer - preallocated array of buffered records
+    - count  - number of buffered records
+    """
+
+    path = None
+    names = None
+    dtype = None
+    block = None
+    buffer = None
+    count = None
+
+    def __init__(self, path, names=None, dtype="float64", block=1024):
+        """Trajectory instantiation operation (constructor).
+        New (empty) trajectory is created when names are given, otherwise existing trajectory is opened.
+
+        Arguments:
+        - path  - path of binary data file
+        - names - list of concept names (columns of records) (optional)
+        - dtype - data type of records of new trajectory (optional)
+        - block - number of records buffered in memory before being written to file (optional)
+        Returns:
+        - new Trajectory object or raises Error exception.
+        """
+
+        self.path = str(path)
+        if names is not None:
+            self.names = list(names)
+            self.dtype = np.dtype(dtype)
+            with open(self.path + ".json", "w") as f:
+                json.dump(dict(names=self.names, dtype=self.dtype.str), f)
+            open(self.path, "wb").close()
+        else:
+            if not os.path.exists(self.path + ".json"):
+                raise Exception("Error - trajectory metadata " + self.path + ".json not found")
+            with open(self.path + ".json") as f:
+                metadata = json.load(f)
+            self.names = metadata["names"]
+            self.dtype = np.dtype(metadata["dtype"])
+        self.block = block
+        self.buffer = np.empty((block, len(self.names)), dtype=self.dtype)
+        self.count = 0
+
+    def __repr__(self):
+        """Return repr(self)."""
+
+        return '%s(%s)' % (type(self).__name__, str(dict(path=self.path, records=len(self), concepts=len(self.names))))
+
+    def __len__(self):
+        """Return number of records (including buffered ones)."""
+
+        return os.path.getsize(self.path) // (self.dtype.itemsize * max(len(self.names), 1)) + self.count
+
+    def append(self, records):
+        """Append records to trajectory.
+
+        Arguments:
+        - records - single record (concepts) or 2-D array of records (records x concepts), columns ordered as names
+        """
+
+        records = np.asarray(records, dtype=self.dtype)
+        if records.ndim == 1:
+            records = records[np.newaxis]
+        if records.ndim != 2 or records.shape[1] != len(self.names):
+            raise Exception("Error - records must have " + str(len(self.names)) + " columns")
+        #large blocks are written directly, small ones are buffered
+        if len(records) >= self.block:
+            self.flush()
+            self.__write(records)
+            return
+        if self.count + len(records) > self.block:
+            self.flush()
+        self.buffer[self.count:self.count + len(records)] = records
+        self.count += len(records)
+
+    def flush(self):
+        """Write buffered records to file."""
+
+        if self.count > 0:
+            self.__write(self.buffer[:self.count])
+            self.count = 0
+
+    def close(self):
+        """Write buffered records to file (trajectory can be still read or appended)."""
+
+        self.flush()
+
+    def data(self):
+        """Return read-only memory map of the whole trajectory (buffered records are written first).
+
+        Returns:
+        - numpy.memmap (records x concepts) or empty numpy array
+        """
+
+        self.flush()
+        if len(self) == 0:
+            return np.empty((0, len(self.names)), dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode="r", shape=(len(self), len(self.names)))
+
+    def read(self, start=None, stop=None, names=None, step=None):
+        """Read time window of trajectory for subset of concepts.
+
+        Arguments:
+        - start - index of first record (optional)
+        - stop  - index after the last record (optional)
+        - names - list of names of read concepts (optional, default all concepts)
+        - step  - read each step-th record (optional)
+        Returns:
+        - numpy array of records (records x concepts) or raises Error exception
+        """
+
+        window = self.data()[start:stop:step]
+        if names is None:
+            return np.array(window)
+        index = dict([(name, i) for i, name in enumerate(self.names)])
+        for name in names:
+            if name not in index:
+                raise Exception("Error - concept " + str(name) + " is not recorded")
+        return window[:, [index[name] for name in names]]
+
+    def __write(self, records):
+        """Append records to binary data file."""
+
+        with open(self.path, "ab") as f:
+            np.ascontiguousarray(records).tofile(f)
@@ -11,16 +11,20 @@ setup(name='fcmlib',
             'fcmlib': 'fcmlib',
             'fcmlib.relations': 'fcmlib/relations',
             'fcmlib.functions': 'fcmlib/functions',
+            'fcmlib.kernels': 'fcmlib/kernels',
+            'fcmlib.learning': 'fcmlib/learning',
             'fcmapi': 'fcmapi',
             'fcmapi.templates': 'fcmapi/templates'},
       packages=[
             'fcmlib',
             'fcmlib.relations',
             'fcmlib.functions',
+            'fcmlib.kernels',
+            'fcmlib.learning',
             'fcmapi',
             'fcmapi.templates'],
       scripts=['fcmapi/fcmapi_app.py','fcmapi/fcmapi_debug.bat','fcmapi/fcmapi_service.bat'],
-      install_requires=['flask'],
+      install_requires=['flask','numpy'],
       dependency_links=['https://github.com/jsonpickle/jsonpickle.git'],
       include_package_data=True,
       zip_safe=False)
\ No newline at end of file